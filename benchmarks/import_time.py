@@ -0,0 +1,72 @@
+"""
+Import time budget of the ssk package.
+
+Every statement is timed in a fresh interpreter, as a short-lived batch
+worker would run it, and the interpreter start up time (python -c pass) is
+subtracted. The median of several runs is compared with its budget; the
+exit status is 1 when any budget is exceeded.
+
+Budgets are multiples of the time of import numpy, measured in the same
+way, so that they follow the speed of the machine and of the numpy and
+scipy builds instead of one reference machine.
+
+Usage: python benchmarks/import_time.py [--repeat 7] [--scale 1.0]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (statement, budget in import numpy times); the subpackages measure about
+# 1x (numpy only), 1.5x (scipy.special), 2.2x and 4.3x (scipy.optimize)
+BUDGETS = [
+    ("import ssk", 0.25),
+    ("import ssk; ssk.helpers", 1.5),
+    ("import ssk; ssk.smoothing", 1.5),
+    ("import ssk; ssk.ti", 2.5),
+    ("import ssk; ssk.alpha", 3.5),
+    ("import ssk; ssk.models", 3.5),
+    ("import ssk; ssk.simulation", 3.5),
+    ("import ssk; ssk.isoconversional", 6.5),
+]
+
+def measure(statement, repeat):
+    """Median wall time of running statement in a new interpreter."""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='1')
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', statement], env=env)
+        times.append(time.time() - start)
+    return sorted(times)[len(times) // 2]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=7,
+                        help="interpreter runs per statement")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="budget multiplier, for slower machines")
+    args = parser.parse_args(argv)
+
+    startup = measure("pass", args.repeat)
+    unit = measure("import numpy", args.repeat) - startup
+    failed = False
+    print("interpreter start up: %.1f ms, import numpy: %.1f ms" %
+          (1e3 * startup, 1e3 * unit))
+    for statement, budget in BUDGETS:
+        spent = measure(statement, args.repeat) - startup
+        limit = budget * unit * args.scale
+        over = spent > limit
+        failed = failed or over
+        print("%-34s %7.1f ms  (budget %5.0f ms)%s" %
+              (statement, 1e3 * spent, 1e3 * limit,
+               "  OVER" if over else ""))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
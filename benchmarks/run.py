@@ -0,0 +1,313 @@
+"""
+ssk benchmark suite.
+
+Times the hot paths of ssk over several data sizes, appends the results to
+a history file (one JSON record per line) and compares them with a stored
+baseline, flagging every case that got slower than the threshold.
+
+Usage:
+
+    python benchmarks/run.py                  # all cases, compare
+    python benchmarks/run.py -k savitzky      # cases whose name matches
+    python benchmarks/run.py --quick          # smallest size of each case
+    python benchmarks/run.py --save-baseline  # store results as baseline
+
+The exit status is 1 when a regression is found.
+
+Timings depend on the machine, so neither the history nor the baseline
+(benchmarks/history.jsonl and benchmarks/baseline.json) is committed:
+store a baseline with --save-baseline on the reference commit before
+comparing a branch against it. Without a baseline every case is only
+reported.
+
+* Every case is a function taking a data size and returning the callable
+  to time, so that setup (data generation, temporary files) is not timed.
+
+* Every (case, size) pair is timed in a fresh interpreter by default, so
+  that earlier cases can't change the results (e.g. the allocator keeps
+  large blocks mapped after a big case, which speeds up the next ones).
+
+* Every callable is called once untimed, so that lazy imports and first
+  call caches are not timed, then runs in batches long enough to time
+  reliably (at least MIN_TIME seconds); the best batch over --repeat is reported per call, as
+  the least noisy estimate. Cases slower than the baseline are timed a
+  second time before being flagged.
+"""
+
+from __future__ import division, print_function
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ssk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY = os.path.join(HERE, 'history.jsonl')
+BASELINE = os.path.join(HERE, 'baseline.json')
+MIN_TIME = 0.2
+
+CASES = []
+
+def case(*sizes):
+    """Registers a benchmark case, run once per data size."""
+    def register(func):
+        CASES.append((func.__name__, func, sizes))
+        return func
+    return register
+
+# Data
+
+def _f1(a):
+    return -np.log(1 - a)
+
+def _curves(rates, size, E=1e5, A=1e10):
+    """Simulated F1 temperatures (rate x alpha) at size conversion levels."""
+    alphas = np.linspace(0.05, 0.95, size)
+    temps = ssk.simulation.batch_nonisothermal(
+        [_f1], A, E, alphas, np.asarray(rates) / 60.)[:, 0, :]
+    return alphas, temps
+
+def _consecutive(T, y, b, A1, E1, A2, E2):
+    k = ssk.simulation.ni_rates(b, T, A1, E1, A2, E2)
+    a0, a1, a2 = y
+    da0 = k[0] * (1 - a0)
+    da1 = k[1] * (a0 - a1)
+    return [da0, da1, (da0 + da1) / 2]
+
+def _signal(size, runs=None):
+    x = np.linspace(0, 10, size)
+    shape = (size,) if runs is None else (runs, size)
+    state = np.random.RandomState(0)
+    return np.tanh(x - 5) + 0.05 * state.standard_normal(shape)
+
+# Cases
+
+@case(100, 1000)
+def single_nonisothermal(size):
+    alphas = np.linspace(0.01, 0.99, size)
+    return lambda: ssk.simulation.single_nonisothermal(_f1, 1e10, 1e5,
+                                                       alphas, 10 / 60.)
+
+@case(1, 10)
+def ni_integrate(size):
+    args = [8, 900 * 60, 58.5e3, 5e8 * 60, 125.4e3]
+    grid = np.linspace(400, 700, 301)
+    def run():
+        for _ in range(size):
+            ssk.simulation.ni_integrate(_consecutive, 400, args=args, T1=700,
+                                        grid=grid)
+    return run
+
+@case(10, 50)
+def nonlinear(size):
+    rates = np.array([2., 5, 10, 20])
+    alphas, temps = _curves(rates, size)
+    start = np.full(size, 9e4)
+    return lambda: ssk.isoconversional.nonlinear(
+        start, rates / 60., temps, optimizer="L-BFGS-B")
+
+@case(100, 10000)
+def ni_ofw(size):
+    rates = np.array([2., 5, 10, 20])
+    alphas, temps = _curves(rates, size)
+    return lambda: ssk.isoconversional.ni_ofw(rates, temps)
+
+@case(100, 10000)
+def ii_standard(size):
+    temps = np.array([600., 620, 640, 660])
+    alphas = np.linspace(0.05, 0.95, size)
+    k = 1e10 * np.exp(-1e5 / (8.314 * temps))
+    times = _f1(alphas)[np.newaxis, :] / k[:, np.newaxis]
+    func = ssk.isoconversional.ii_standard
+    return lambda: func(times, temps)
+
+@case(10000, 1000000)
+def savitzky_golay(size):
+    y = _signal(size)
+    return lambda: ssk.smoothing.savitzky_golay(y, 51, 3)
+
+@case(10000, 100000)
+def alpha_area(size):
+    y = _signal(size, runs=10)
+    return lambda: ssk.alpha.area(y)
+
+@case(1000, 50000)
+def excel_write(size):
+    arrays = [_signal(size, runs=3)]
+    folder = tempfile.mkdtemp()
+    filename = os.path.join(folder, 'bench.xls')
+    return _cleanup(lambda: ssk.helpers.write_excel(filename, ['run'], arrays),
+                    folder)
+
+@case(1000, 50000)
+def excel_read(size):
+    folder = tempfile.mkdtemp()
+    filename = os.path.join(folder, 'bench.xls')
+    ssk.helpers.write_excel(filename, ['run'], [_signal(size, runs=3)])
+    return _cleanup(lambda: ssk.helpers.read_excel(filename), folder)
+
+def _cleanup(func, folder):
+    """Marks a folder to be deleted once func has been timed."""
+    func.cleanup = lambda: shutil.rmtree(folder, ignore_errors=True)
+    return func
+
+# Runner
+
+def measure(func, repeat):
+    """Best time per call of func, in seconds."""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        spent = timer.timeit(number)
+        if spent >= MIN_TIME or number >= 1e6:
+            break
+        number *= max(2, int(MIN_TIME / max(spent, 1e-9)))
+    return min([spent] + timer.repeat(repeat - 1, number)) / number
+
+def time_case(name, size, repeat):
+    """Best time per call of one case at one size, in this process."""
+    setup = dict((case[0], case[1]) for case in CASES)[name]
+    func = setup(size)
+    try:
+        func()
+        return measure(func, repeat)
+    finally:
+        getattr(func, 'cleanup', lambda: None)()
+
+def run(pattern=None, quick=False, repeat=3, isolate=True):
+    """Times the matching cases, returning {'name[size]': seconds}."""
+    keys = []
+    for name, _, sizes in CASES:
+        if pattern and not re.search(pattern, name):
+            continue
+        keys.extend('%s[%d]' % (name, size)
+                    for size in (sizes[:1] if quick else sizes))
+    return retime(keys, repeat, isolate)
+
+def retime(keys, repeat=3, isolate=True):
+    """Times the given 'name[size]' cases."""
+    results = {}
+    for key in keys:
+        name, size = re.match(r'(\w+)\[(\d+)\]$', key).groups()
+        if isolate:
+            out = subprocess.check_output(
+                [sys.executable, os.path.abspath(__file__), '--worker',
+                 name, size, '--repeat', str(repeat)])
+            results[key] = float(out.decode())
+        else:
+            results[key] = time_case(name, int(size), repeat)
+    return results
+
+def compare(results, baseline, threshold):
+    """Prints results against baseline, returning the regressed cases."""
+    regressions = []
+    for key in sorted(results):
+        line = "%-32s %12s" % (key, _format(results[key]))
+        if key in baseline:
+            ratio = results[key] / baseline[key]
+            line += "  %12s  x%.2f" % (_format(baseline[key]), ratio)
+            if ratio > 1 + threshold:
+                line += "  REGRESSION"
+                regressions.append(key)
+        print(line)
+    return regressions
+
+def record(results, filename):
+    """Appends one run to the history file."""
+    entry = dict(
+        date=datetime.datetime.utcnow().isoformat() + 'Z',
+        commit=_commit(),
+        python=platform.python_version(),
+        numpy=np.__version__,
+        machine=platform.node(),
+        results=results)
+    with open(filename, 'a') as f:
+        f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+def _commit():
+    try:
+        out = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                      cwd=ROOT, stderr=open(os.devnull, 'w'))
+        return out.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _format(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            break
+    return "%.3g %s" % (seconds / scale, unit)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ssk benchmark suite.")
+    parser.add_argument('-k', dest='pattern',
+                        help="only cases whose name matches this regex")
+    parser.add_argument('--quick', action='store_true',
+                        help="smallest size of every case only")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="timed batches per case")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="slowdown flagged as a regression (0.2 = 20%%)")
+    parser.add_argument('--history', default=HISTORY,
+                        help="history file (JSON lines)")
+    parser.add_argument('--baseline', default=BASELINE,
+                        help="baseline file (JSON)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store these results as the baseline")
+    parser.add_argument('--no-history', action='store_true',
+                        help="don't append these results to the history")
+    parser.add_argument('--inline', action='store_true',
+                        help="time all cases in this process")
+    parser.add_argument('--worker', nargs=2, metavar=('CASE', 'SIZE'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        name, size = args.worker
+        print(repr(time_case(name, int(size), args.repeat)))
+        return 0
+
+    start = time.time()
+    results = run(args.pattern, args.quick, args.repeat, not args.inline)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    # slow cases are timed once more, and only regress if slow both times
+    slower = [key for key in results if key in baseline and
+              results[key] > (1 + args.threshold) * baseline[key]]
+    for key, seconds in retime(slower, args.repeat, not args.inline).items():
+        results[key] = min(results[key], seconds)
+
+    regressions = compare(results, baseline, args.threshold)
+    print("%d cases in %.1f s, %d regressions" %
+          (len(results), time.time() - start, len(regressions)))
+
+    if not args.no_history:
+        record(results, args.history)
+    if args.save_baseline:
+        # keep the baseline of cases that were not run this time
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(commit=_commit(), results=baseline), f, indent=1,
+                      sort_keys=True)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
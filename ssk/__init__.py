@@ -10,7 +10,8 @@ Submodules:
 * alpha: Functions for getting transformed fraction values from experimental
   data.
     - Simple thermogravimetric formula.
-    - Area Under Curve (AUC)
+    - Area Under Curve (AUC), with baseline subtraction for DSC signals.
+    - Batch extraction onto a shared conversion grid.
   
 * models: Kinetic models, including:
     - Reaction order (F)
@@ -19,27 +20,66 @@ Submodules:
     - Diffusion (D)
     - Sestak-Berggren
     - Kolmogorov-Johnson-Mehl-Avrami 
+    - Model fitting, per curve or global across heating rates
     
 * isoconversional: Isoconversional methods:
     - Standard (Isothermal, Integral)
     - Ozawa-Flynn-Wall (Non-isothermal, Integral)
+    - Kissinger-Akahira-Sunose (Non-isothermal, Integral)
+    - Friedman (Non-isothermal, Differential)
     - Nonlinear (Vyazovkin)
+    - Bootstrap and jackknife confidence bands for Ea(alpha)
 
 * simulation: Single-step reaction simulation.
 
 * smoothing: Signal/curve smoothing.
     - Savitzky-Golay filter (https://gist.github.com/RyanHope/2321077)
+    - Moving-window linear regression
+    - Whittaker smoother
 
 * helpers: Miscellaneous functions.
     - Excel file reading and writing.
 """
 
-# Submodule imports
-import ti
-import alpha
-import models
-import helpers
-import smoothing
-import simulation
-import isoconversional
+# Submodules are imported on first access (ssk.ti, from ssk import ti), so
+# that 'import ssk' doesn't import scipy and the Excel libraries up front.
+# Python 2 modules have no __getattr__ hook: the package module is replaced
+# in sys.modules by a _LazyPackage with the same contents.
+import importlib
+import sys
+import types
 
+_SUBMODULES = (
+    'ti',
+    'alpha',
+    'models',
+    'helpers',
+    'smoothing',
+    'simulation',
+    'isoconversional'
+)
+
+__all__ = list(_SUBMODULES)
+
+class _LazyPackage(types.ModuleType):
+    """The ssk package, importing its submodules on first access."""
+
+    def __getattr__(self, name):
+        if name in _SUBMODULES:
+            return importlib.import_module('.' + name, self.__name__)
+        raise AttributeError("module %r has no attribute %r" %
+                             (self.__name__, name))
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_SUBMODULES))
+
+def _install():
+    module = sys.modules[__name__]
+    package = _LazyPackage(__name__, __doc__)
+    package.__dict__.update(module.__dict__)
+    # the original module must outlive the replacement: Python 2 clears the
+    # globals of a deallocated module, and the functions above use them
+    package._module = module
+    sys.modules[__name__] = package
+
+_install()
@@ -4,3 +4,4 @@ from pre-processed experimental data points.
 """
 
 from api import *
+from resample import *
@@ -1,14 +1,114 @@
+"""
+alpha submodule implementation notes.
+
+* Every function works on one signal or on a 2-D array of runs (one run per
+  row), always along the last axis.
+
+* extract chains the conversion functions with a resampling onto a shared
+  conversion grid (resample.ConversionIndex), which is the layout the
+  isoconversional methods expect.
+"""
+
 from __future__ import division
 import numpy as np
 from scipy import integrate
 
-__all__ = ['area', 'simple']
+from .resample import ConversionIndex
+
+__all__ = ['area', 'simple', 'dsc', 'extract']
 
-def simple(p):
-    pass
+def simple(p, initial=None, final=None):
+    """
+    Thermogravimetric transformed fraction: (m0 - m) / (m0 - mf).
+
+    Parameters
+    ----------
+    p : ndarray
+        Sample mass (or mass percent), one run or one run per row.
+    initial, final : float or ndarray (optional)
+        Initial and final masses, first and last samples by default.
+    """
+    p = np.asarray(p, dtype=float)
+    m0 = p[..., :1] if initial is None else np.asarray(initial)[..., np.newaxis]
+    mf = p[..., -1:] if final is None else np.asarray(final)[..., np.newaxis]
+    return (m0 - p) / (m0 - mf)
 
 def area(p):
-    cumul = np.hstack(([0], integrate.cumtrapz(np.abs(np.gradient(p)))))
-    return cumul / max(cumul)
-    
+    cumul = integrate.cumtrapz(np.abs(np.gradient(p, axis=-1)), axis=-1,
+                               initial=0)
+    return cumul / cumul.max(axis=-1)[..., np.newaxis]
+
+def dsc(signal, x=None, baseline="linear"):
+    """
+    Area under curve transformed fraction, for DSC (heat flow) signals.
+
+    Parameters
+    ----------
+    signal : ndarray
+        Heat flow, one run or one run per row.
+    x : ndarray (optional)
+        Temperature or time of every sample (shared or one row per run).
+        Evenly spaced samples by default.
+    baseline : str or None
+        "linear" (line between the first and last samples), "constant"
+        (first sample) or None.
+    """
+    signal = np.asarray(signal, dtype=float)
+    if x is None:
+        x = np.arange(signal.shape[-1], dtype=float)
+    x = np.broadcast_to(np.asarray(x, dtype=float), signal.shape)
+
+    if baseline == "linear":
+        first, last = signal[..., :1], signal[..., -1:]
+        start, end = x[..., :1], x[..., -1:]
+        signal = signal - (first + (last - first) * (x - start) / (end - start))
+    elif baseline == "constant":
+        signal = signal - signal[..., :1]
+    elif baseline is not None:
+        raise NotImplementedError("baseline parameter not recognized")
+
+    cumul = integrate.cumtrapz(signal, x, axis=-1, initial=0)
+    return cumul / cumul[..., -1:]
+
+def extract(data, kind="tg", x=None, grid=None, baseline="linear"):
+    """
+    Transformed fractions for a batch of runs.
+
+    Parameters
+    ----------
+    data : ndarray
+        Mass (kind="tg") or heat flow (kind="dsc") signals, one run per row.
+    kind : str
+        "tg" uses simple, "dsc" uses dsc and "area" uses area.
+    x : ndarray (optional)
+        Temperature or time of every sample (shared or one row per run).
+        Required with grid.
+    grid : ndarray (optional)
+        Conversion levels at which to report x.
+    baseline : str or None
+        Baseline for kind="dsc".
+
+    Returns
+    -------
+    Transformed fractions with the shape of data or, with a grid, the x
+    values at which every run reaches each grid level (run x grid), nan
+    where a run never reaches a level.
+    """
+    if grid is not None and x is None:
+        raise ValueError("x is required with grid")
+
+    data = np.atleast_2d(data)
+    if kind == "tg":
+        alphas = simple(data)
+    elif kind == "dsc":
+        alphas = dsc(data, x, baseline)
+    elif kind == "area":
+        alphas = area(data)
+    else:
+        raise NotImplementedError("kind parameter not recognized")
+
+    if grid is None:
+        return alphas
 
+    x = np.broadcast_to(np.asarray(x, dtype=float), alphas.shape)
+    return ConversionIndex(zip(x, alphas)).resample(grid)
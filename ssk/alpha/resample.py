@@ -0,0 +1,107 @@
+"""
+Resampling of raw (x, alpha) curves onto a shared conversion grid, which is
+the input layout of the isoconversional methods (T[i][n] or t[i][n]).
+
+* ConversionIndex concatenates all curves in one sorted key array, where
+  run r covers keys [2r, 2r + 1]. A single searchsorted call then locates
+  every (run, level) pair of any grid.
+
+* The index is built once per set of curves; resample only interpolates,
+  and remembers its last grid.
+
+* Non-finite samples are dropped, and levels a curve never reaches (below
+  its first alpha or above its maximum) are nan rather than clamped to
+  the curve's ends, so they can't bias the isoconversional methods.
+"""
+
+from __future__ import division
+import numpy as np
+
+__all__ = ['ConversionIndex']
+
+class ConversionIndex(object):
+    """
+    Search index over several (x, alpha) curves of differing lengths.
+
+    Parameters
+    ----------
+    curves : iterable
+        (x, alpha) pairs, x being temperatures or times. Non-finite samples
+        are dropped, alpha is made monotone (running maximum) and only the
+        ends of every run of repeated values are kept.
+
+    Examples
+    --------
+    index = ConversionIndex(zip(temps, alphas))
+    T = index.resample(np.linspace(0.05, 0.95, 91))    # (run, grid)
+    """
+
+    def __init__(self, curves):
+        keys, values, bounds, ranges = [], [], [0], []
+        for run, (x, alpha) in enumerate(curves):
+            x = np.asarray(x, dtype=float)
+            alpha = np.asarray(alpha, dtype=float)
+            finite = np.isfinite(x) & np.isfinite(alpha)
+            x, alpha = x[finite], np.maximum.accumulate(alpha[finite])
+            ranges.append((alpha[0], alpha[-1]) if len(alpha) else
+                          (np.inf, -np.inf))
+
+            alpha = np.clip(alpha, 0, 1)
+            rises = np.diff(alpha) > 0
+            keep = (np.r_[True, rises] | np.r_[rises, True])[:len(alpha)]
+            keys.append(2 * run + alpha[keep])
+            values.append(x[keep])
+            bounds.append(bounds[-1] + keep.sum())
+
+        self.keys = np.concatenate(keys)
+        self.values = np.concatenate(values)
+        self.bounds = np.array(bounds)
+        # (first, largest) alpha of every curve
+        self.ranges = np.array(ranges).reshape(-1, 2)
+        self._last = None, None
+
+    def __len__(self):
+        return len(self.bounds) - 1
+
+    def resample(self, grid):
+        """
+        Interpolates every curve at the grid conversion levels, between the
+        last sample below each level and the first one reaching it. Levels
+        out of a curve's range (first to largest alpha) are nan.
+
+        Returns
+        -------
+        ndarray with shape (run, grid), not writeable.
+        """
+        grid = np.asarray(grid, dtype=float)
+        key = grid.tobytes()
+        if self._last[0] == key:
+            return self._last[1]
+
+        runs = np.arange(len(self))[:, np.newaxis]
+        queries = 2 * runs + np.clip(grid, 0, 1)
+        start, end = self.bounds[:-1, np.newaxis], self.bounds[1:, np.newaxis]
+
+        reached = (grid >= self.ranges[:, :1]) & (grid <= self.ranges[:, 1:])
+        if not len(self.keys):
+            out = np.full(reached.shape, np.nan)
+            out.flags.writeable = False
+            self._last = key, out
+            return out
+
+        right = np.searchsorted(self.keys, queries, side='left')
+        right = np.minimum(np.maximum(right, start + 1), end - 1)
+        left = np.where(end - start > 1, right - 1, right)
+        # empty curves: any valid index, the result is masked
+        left, right = [np.clip(i, 0, len(self.keys) - 1) for i in (left, right)]
+
+        k0, k1 = self.keys[left], self.keys[right]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.clip((queries - k0) / (k1 - k0), 0, 1)
+        weight = np.where(k1 > k0, weight, 0)
+        out = self.values[left] + weight * (self.values[right] - self.values[left])
+        out = np.where(reached, out, np.nan)
+
+        out.flags.writeable = False
+        self._last = key, out
+        return out
@@ -1,2 +1,5 @@
 from api import *
 from excel import *
+from tables import *
+from dataset import *
+from instrument import *
@@ -0,0 +1,101 @@
+"""
+ssk run files: a binary format for single TGA/DSC runs that is opened as a
+memory-mapped ndarray, so no parsing or copy happens until data is used.
+
+Layout:
+
+* 8 bytes: magic string and format version.
+* 4 bytes: little-endian header length.
+* JSON header: dtype, shape and run metadata (heating rate, sample mass,
+  temperature units and any other keyword), padded with spaces so that the
+  data starts at a multiple of 64 bytes.
+* Data: the array in C order, one row per column as in read_excel.
+"""
+
+import json
+import struct
+import numpy as np
+
+from .excel import read_excel
+
+__all__ = ['write_run', 'open_run', 'read_run_meta', 'excel_to_run']
+
+_MAGIC = b'\x93SSKRUN\x01'
+_ALIGN = 64
+
+def write_run(filename, array, rate=None, mass=None, units='K', **meta):
+    """
+    Writes an ndarray and its metadata to an ssk run file.
+
+    Parameters
+    ----------
+    filename : string
+        Path to file.
+    array : ndarray
+        Run data, one row per column.
+    rate : float (optional)
+        Heating rate.
+    mass : float (optional)
+        Sample mass.
+    units : string
+        Temperature units.
+    meta : keyword arguments
+        Any other JSON serializable metadata.
+    """
+    array = np.ascontiguousarray(array)
+    meta.update(rate=rate, mass=mass, units=units)
+    header = dict(meta=meta, dtype=array.dtype.str, shape=array.shape)
+    header = json.dumps(header).encode('utf-8')
+
+    used = len(_MAGIC) + 4 + len(header)
+    header += b' ' * (-used % _ALIGN)
+
+    with open(filename, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(array.tobytes())
+
+def open_run(filename, mode='r'):
+    """
+    Opens an ssk run file without reading its data.
+
+    Parameters
+    ----------
+    filename : string
+        Path to file.
+    mode : string
+        np.memmap mode: 'r' (read-only), 'r+' (in place changes) or 'c'
+        (copy-on-write).
+
+    Returns
+    -------
+    array : np.memmap
+        Run data, paged from disk on access.
+    meta : dict
+        Run metadata.
+    """
+    header, offset = _read_header(filename)
+    array = np.memmap(filename, dtype=np.dtype(str(header['dtype'])),
+                      mode=mode, offset=offset, shape=tuple(header['shape']))
+    return array, header['meta']
+
+def read_run_meta(filename):
+    """Reads the metadata of an ssk run file only."""
+    return _read_header(filename)[0]['meta']
+
+def excel_to_run(excelname, filename, n=0, **meta):
+    """
+    Converts a sheet from an Excel file (as read by read_excel) into an ssk
+    run file. Keyword arguments are write_run's metadata.
+    """
+    write_run(filename, read_excel(excelname, n), **meta)
+
+def _read_header(filename):
+    """Returns the decoded header and the data offset of a run file."""
+    with open(filename, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise IOError("%s is not an ssk run file" % filename)
+        length, = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(length).decode('utf-8'))
+    return header, len(_MAGIC) + 4 + length
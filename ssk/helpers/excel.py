@@ -1,10 +1,9 @@
-import xlrd
-import xlwt
+# xlrd and xlwt are imported on first use, to keep 'import ssk' light
 import numpy as np
 
-__all__ = ['read_excel', 'write_excel']
+__all__ = ['read_excel', 'iter_excel', 'write_excel']
 
-def read_excel(filename, n=0):
+def read_excel(filename, n=0, usecols=None, step=1):
     """
     Converts a sheet from an Excel file into an ndarray. Assumes all fields are
     numeric values.
@@ -13,21 +12,52 @@ def read_excel(filename, n=0):
     ----------
     filename : string
         Path to file.
+    n : int
+        Sheet index.
+    usecols : iterable (int) (optional)
+        Columns to read, all of them by default.
+    step : int
+        Keep one row every step rows.
         
     Returns
     -------
-    ndarray with sheet contents.
+    ndarray with sheet contents, one row per sheet column.
     """
+    sheet = _open_sheet(filename, n)
+    return _read_columns(sheet, usecols, 0, sheet.nrows, step)
+
+def iter_excel(filename, n=0, chunksize=10000, usecols=None, step=1):
+    """
+    Reads a sheet from an Excel file in blocks of rows. Same parameters as
+    read_excel, plus chunksize (rows per block, before downsampling).
+    
+    Yields
+    ------
+    ndarray blocks with one row per sheet column.
+    """
+    sheet = _open_sheet(filename, n)
+    for start in range(0, sheet.nrows, chunksize):
+        end = min(start + chunksize, sheet.nrows)
+        # keep the step pattern aligned with absolute row numbers
+        first = start + (-start % step)
+        yield _read_columns(sheet, usecols, first, end, step)
+
+def _open_sheet(filename, n):
+    """Opens sheet n of an Excel file."""
+    import xlrd
+
     contentstring = open(filename, 'rb').read()
     book  = xlrd.open_workbook(file_contents=contentstring)
-    sheet = book.sheets()[n]
-    array = np.zeros((sheet.ncols, sheet.nrows))
-    
-    for row in range(sheet.nrows):
-        for col in range(sheet.ncols):
-            array[col][row] = sheet.cell(row, col).value
-    
-    return array
+    return book.sheets()[n]
+
+def _read_columns(sheet, usecols, start, end, step):
+    """Reads rows [start, end) of several columns, one column per call."""
+    if usecols is None:
+        usecols = range(sheet.ncols)
+    if start >= end:
+        return np.zeros((len(usecols), 0))
+    return np.array([sheet.col_values(col, start, end)[::step] 
+                     for col in usecols], dtype=float)
 
 def write_excel(filename, sheetnames, arrays):
     """
@@ -46,14 +76,18 @@ def write_excel(filename, sheetnames, arrays):
     if len(sheetnames) != len(arrays):
         raise IndexError("Array and sheet number must be equal.")
         
+    import xlwt
+
     book = xlwt.Workbook()
     
     for name, array in zip(sheetnames, arrays):
         sheet = book.add_sheet(name)
-        cols, rows = array.shape
+        array = np.asarray(array, dtype=float)
+        rows = [sheet.row(row) for row in range(array.shape[1])]
         
-        for row in range(rows):
-            for col in range(cols):
-                sheet.write(row, col, array[col][row])
+        # one column at a time, as python floats, skipping write's dispatch
+        for col, values in enumerate(array.tolist()):
+            for row, value in zip(rows, values):
+                row.set_cell_number(col, value)
     
     book.save(filename)
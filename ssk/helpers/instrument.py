@@ -0,0 +1,214 @@
+"""
+Instrumentation of the optimizer and integrator driven routines
+(isoconversional.nonlinear, simulation.single_nonisothermal and
+simulation.ni_integrate).
+
+* Every call of those routines opens a Record through track(). Records are
+  only kept inside a profile() block: otherwise track() returns a shared
+  no-op record, and counted() returns the wrapped function itself, so the
+  routines run as before.
+
+* A Record holds call counters (objective, gradient, right-hand side and
+  Jacobian evaluations), wall time per stage, a convergence trace and the
+  solver's final figures (info). Profile collects them in memory and can
+  summarize them per routine or export them as JSON.
+"""
+
+import collections
+import json
+import time
+
+__all__ = ['Profile', 'profile', 'track']
+
+_ACTIVE = []
+
+class Record(object):
+    """
+    Instrumentation of one routine call.
+
+    Attributes
+    ----------
+    routine : str
+        Routine name.
+    info : dict
+        Call parameters and final solver figures.
+    counts : Counter
+        Number of calls of every counted function.
+    stages : OrderedDict
+        Wall time (s) of every stage, plus 'total'.
+    trace : list
+        Convergence trace: objective values in evaluation order
+        (nonlinear), or evaluations per alpha (single_nonisothermal with
+        minimize).
+    """
+
+    def __init__(self, routine, info):
+        self.routine = routine
+        self.info = info
+        self.counts = collections.Counter()
+        self.stages = collections.OrderedDict()
+        self.trace = []
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, kind, value, tb):
+        self.stages['total'] = time.time() - self._start
+        if kind is not None:
+            self.info['error'] = repr(value)
+        for profile in _ACTIVE:
+            profile._add(self)
+        return False
+
+    def counted(self, func, name, trace=False):
+        """Wraps func to count its calls (and keep its values in trace)."""
+        def wrapper(*args, **kwargs):
+            self.counts[name] += 1
+            value = func(*args, **kwargs)
+            if trace:
+                self.trace.append(float(value))
+            return value
+        return wrapper
+
+    def stage(self, name):
+        """Context manager adding its wall time to stage name."""
+        return _Stage(self.stages, name)
+
+    def update(self, **info):
+        self.info.update(info)
+
+    def as_dict(self):
+        return dict(routine=self.routine, info=self.info,
+                    counts=dict(self.counts), stages=dict(self.stages),
+                    trace=self.trace)
+
+class _Stage(object):
+    def __init__(self, stages, name):
+        self.stages, self.name = stages, name
+
+    def __enter__(self):
+        self.start = time.time()
+
+    def __exit__(self, *exc):
+        spent = time.time() - self.start
+        self.stages[self.name] = self.stages.get(self.name, 0) + spent
+        return False
+
+class _NullRecord(object):
+    """Record used outside profile blocks: records nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def counted(self, func, name, trace=False):
+        return func
+
+    def stage(self, name):
+        return self
+
+    @property
+    def trace(self):
+        return []
+
+    def update(self, **info):
+        pass
+
+_NULL = _NullRecord()
+
+def track(routine, **info):
+    """
+    Opens the Record of a routine call, to be used as a context manager.
+    Outside profile blocks it returns a no-op record.
+    """
+    if not _ACTIVE:
+        return _NULL
+    return Record(routine, info)
+
+class Profile(object):
+    """
+    In-memory collector of Records.
+
+    Parameters
+    ----------
+    callback : callable (optional)
+        Called with every finished Record, e.g. to log runs whose
+        evaluation count is too high.
+    """
+
+    def __init__(self, callback=None):
+        self.records = []
+        self.callback = callback
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def _add(self, record):
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def select(self, routine):
+        """Records of one routine."""
+        return [r for r in self.records if r.routine == routine]
+
+    def summary(self):
+        """
+        Totals per routine: calls, time (s), and the sum and maximum of
+        every counter over the calls.
+        """
+        totals = collections.OrderedDict()
+        for record in self.records:
+            entry = totals.setdefault(record.routine, dict(
+                calls=0, time=0.0, counts={}, max_counts={}))
+            entry['calls'] += 1
+            entry['time'] += record.stages.get('total', 0)
+            for name, n in record.counts.items():
+                entry['counts'][name] = entry['counts'].get(name, 0) + n
+                entry['max_counts'][name] = max(
+                    entry['max_counts'].get(name, 0), n)
+        return totals
+
+    def to_list(self):
+        return [record.as_dict() for record in self.records]
+
+    def export(self, filename):
+        """Writes every record to a JSON file."""
+        with open(filename, 'w') as f:
+            json.dump(self.to_list(), f, default=_jsonable, indent=1)
+
+class profile(object):
+    """
+    Context manager collecting the Records of every instrumented call made
+    inside it, in a new Profile.
+
+    Examples
+    --------
+    with profile() as prof:
+        nonlinear(eas, rates, temps)
+    prof.summary()['nonlinear']['counts']['fun']
+    """
+
+    def __init__(self, callback=None):
+        self.profile = Profile(callback)
+
+    def __enter__(self):
+        _ACTIVE.append(self.profile)
+        return self.profile
+
+    def __exit__(self, *exc):
+        _ACTIVE.remove(self.profile)
+        return False
+
+def _jsonable(value):
+    """JSON fallback for numpy scalars and arrays."""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return repr(value)
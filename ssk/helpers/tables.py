@@ -0,0 +1,211 @@
+"""
+Delimited text (CSV/TSV) data files, numpy archives, and loaders/writers
+that pick the format from the file extension.
+
+* Arrays follow read_excel's layout: one row per file column. Results with 
+  one row per alpha value (e.g. from isoconversional) must be transposed.
+
+* The iter_* generators read fixed-size blocks of lines, so processing can
+  start before a large file is fully loaded. Downsampling (step) is applied
+  to the raw lines, before they are parsed, and every block is parsed in 
+  bulk by numpy instead of line by line.
+"""
+
+import itertools
+import os
+import numpy as np
+
+from .excel import read_excel, iter_excel, write_excel
+
+__all__ = [
+    'read_table',
+    'iter_table',
+    'read_data',
+    'iter_data',
+    'write_table',
+    'write_npz',
+    'write_data'
+]
+
+_EXCEL = ('.xls', '.xlsx')
+_DELIMITERS = {'.csv': ',', '.tsv': '\t'}
+
+def read_table(filename, delimiter=None, skiprows=0, usecols=None, step=1):
+    """
+    Converts a delimited text file into an ndarray. Assumes all fields are
+    numeric values.
+
+    Parameters
+    ----------
+    filename : string
+        Path to file.
+    delimiter : string (optional)
+        Field separator, whitespace by default.
+    skiprows : int
+        Header lines to skip.
+    usecols : iterable (int) (optional)
+        Columns to read, all of them by default.
+    step : int
+        Keep one row every step rows.
+
+    Returns
+    -------
+    ndarray with file contents, one row per file column. Files without
+    data rows give an empty (len(usecols), 0) array, or (0, 0) when usecols
+    is not given.
+    """
+    blocks = list(iter_table(filename, None, delimiter, skiprows, usecols,
+                             step))
+    if not blocks:
+        return np.zeros((0 if usecols is None else len(usecols), 0))
+    return np.hstack(blocks)
+
+def iter_table(filename, chunksize=10000, delimiter=None, skiprows=0,
+               usecols=None, step=1):
+    """
+    Reads a delimited text file in blocks of rows. Same parameters as
+    read_table, plus chunksize (rows per block, before downsampling; None
+    reads the whole file as one block).
+
+    Yields
+    ------
+    ndarray blocks with one row per file column.
+    """
+    with open(filename) as lines:
+        for _ in range(skiprows):
+            next(lines, None)
+
+        rows = itertools.islice(lines, 0, None, step)
+        size = None if chunksize is None else max(1, chunksize // step)
+
+        while True:
+            block = list(itertools.islice(rows, size))
+            if not block:
+                break
+            yield _parse(block, delimiter, usecols).T
+            if size is None:
+                break
+
+def _parse(lines, delimiter, usecols):
+    """
+    Parses a block of lines in one pass of numpy's C text parser, falling
+    back to loadtxt for blocks it cannot handle (blank lines, comments,
+    rows with differing field counts...).
+    """
+    columns = len(lines[0].split(delimiter))
+    if delimiter is None:
+        counts = [len(line.split()) for line in lines]
+    else:
+        counts = [line.count(delimiter) + 1 for line in lines]
+    if any(count != columns for count in counts):
+        return np.loadtxt(lines, delimiter=delimiter, usecols=usecols,
+                          ndmin=2)
+
+    text = ''.join(lines)
+    if delimiter is not None:
+        text = text.replace(delimiter, ' ')
+    values = np.fromstring(text, sep=' ')
+
+    if values.size != len(lines) * columns:
+        return np.loadtxt(lines, delimiter=delimiter, usecols=usecols,
+                          ndmin=2)
+
+    values = values.reshape(len(lines), columns)
+    return values if usecols is None else values[:, list(usecols)]
+
+def read_data(filename, **kwargs):
+    """
+    Reads an Excel, CSV or TSV file (by extension) into an ndarray with one
+    row per column. Keyword arguments go to read_excel or read_table.
+    """
+    reader, kwargs = _dispatch(filename, kwargs, read_excel, read_table)
+    return reader(filename, **kwargs)
+
+def iter_data(filename, **kwargs):
+    """
+    Reads an Excel, CSV or TSV file (by extension) in blocks of rows. Keyword
+    arguments go to iter_excel or iter_table.
+    """
+    reader, kwargs = _dispatch(filename, kwargs, iter_excel, iter_table)
+    return reader(filename, **kwargs)
+
+def _dispatch(filename, kwargs, excel, table):
+    """Picks the Excel or text reader and the default delimiter."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in _EXCEL:
+        return excel, kwargs
+    kwargs = dict(kwargs)
+    kwargs.setdefault('delimiter', _DELIMITERS.get(extension))
+    return table, kwargs
+
+def write_table(filename, array, delimiter=',', header=None, fmt='%.18e'):
+    """
+    Writes an ndarray (one row per column, as read_table returns it) to a 
+    delimited text file in a single numpy call.
+
+    Parameters
+    ----------
+    filename : string
+        Path to file.
+    array : ndarray
+        Data, one row per file column.
+    delimiter : string
+        Field separator.
+    header : iterable (string) (optional)
+        Column names.
+    fmt : string
+        Number format.
+    """
+    header = '' if header is None else delimiter.join(header)
+    np.savetxt(filename, np.asarray(array).T, fmt=fmt, delimiter=delimiter,
+               header=header, comments='')
+
+def write_npz(filename, arrays, compressed=True):
+    """
+    Writes named arrays to a numpy .npz archive.
+
+    Parameters
+    ----------
+    filename : string
+        Path to file.
+    arrays : dict
+        Arrays by name.
+    compressed : boolean
+        Use zip compression.
+    """
+    save = np.savez_compressed if compressed else np.savez
+    save(filename, **dict(arrays))
+
+def write_data(filename, arrays):
+    """
+    Exports a set of named arrays in one call, with the format given by the
+    file extension:
+
+    * .xls: one sheet per array (write_excel). .xlsx is not supported, as
+      write_excel only writes the old .xls format.
+    * .npz: one compressed archive entry per array (write_npz).
+    * .csv/.tsv/other: one file per array, named <filename>_<name><ext>
+      (write_table).
+
+    Parameters
+    ----------
+    filename : string
+        Path to file.
+    arrays : dict or iterable of (name, array) pairs
+        Arrays by name, one row per column. Pairs or an OrderedDict keep 
+        the sheet order.
+    """
+    pairs = list(arrays.items()) if hasattr(arrays, 'items') else list(arrays)
+    base, extension = os.path.splitext(filename)
+
+    if extension.lower() == '.xlsx':
+        raise ValueError("write_excel only writes .xls files")
+    elif extension.lower() in _EXCEL:
+        write_excel(filename, [name for name, _ in pairs],
+                    [array for _, array in pairs])
+    elif extension.lower() == '.npz':
+        write_npz(filename, pairs)
+    else:
+        delimiter = _DELIMITERS.get(extension.lower(), ',')
+        for name, array in pairs:
+            write_table('%s_%s%s' % (base, name, extension), array, delimiter)
@@ -1 +1,2 @@
 from .api import *
+from .bootstrap import *
@@ -1,126 +1,321 @@
 """
 isoconversional module implementation notes.
 
-* nonlinear depends on _vkin_multiple.
+* nonlinear depends on _vkin_fast and _vkin_mod_iso. Both are evaluated as 
+  one broadcast over an (run x run x alpha) tensor of pairwise integral 
+  ratios (_vkin_pairs) and have analytic gradients for gradient-based 
+  optimizers.
 
-* linear methods use helpers.returnarray for automatically transforming
-  generators into ndarrays. 
+* The isothermal time integral J(Ea, t, T) = t*exp(-Ea/RT) (see 
+  ti.time_integral) is evaluated in closed form and in log space, instead 
+  of by quadrature.
+
+* nonlinear_pointwise solves every alpha on its own, since the objective is
+  a sum of independent per-alpha terms. Chunks of alpha columns are sent to 
+  _vkin_solve_chunk through a multiprocessing pool.
+
+* linear methods (ii_standard, ni_ofw, ni_kas, ni_friedman) run every 
+  alpha column through one batched least squares fit (_linregress), and 
+  return one (Ea, intercept, r, p, stderr) row per alpha.
 """
 
 from __future__ import division
 import functools
-import itertools
+import multiprocessing
 import numpy as np
 from scipy.constants import R
-from scipy.stats import linregress
-from scipy.optimize import minimize
-from scipy.integrate import quad
+from scipy.stats import t as student_t
+from scipy.optimize import minimize, minimize_scalar
 
-from ..helpers import returnarray
-from ..ti import senumyang, timeint # doyle
+from ..helpers.instrument import track
+from ..ti import senumyang_log, senumyang_dlog # doyle
 
 __all__ = [
     'ii_standard',
     'ni_ofw',
-    'nonlinear'
+    'ni_kas',
+    'ni_friedman',
+    'nonlinear',
+    'nonlinear_pointwise'
 ]
 
-@returnarray
 def ii_standard(times, temps):
     """
     Isothermal, Integral: Standard isoconversional method
     """
-    x = [1/T for T in temps]
-    for n in range(len(times[0])):
-        y = [-np.log(t[n]) for t in times]
-        s, i, r, p, e = linregress(x, y)
-        yield -s * R, i, r, p, e
+    x = 1 / np.asarray(temps, dtype=float)[:, np.newaxis]
+    y = -np.log(times)
+    s, i, r, p, e = _linregress(x, y)
+    return np.column_stack((-s * R, i, r, p, e))
 
-@returnarray
 def ni_ofw(rates, temps):
     """
     Non-isothermal, Integral: Ozawa-Flynn-Wall isoconversional method.
     It uses Doyle's approximation.
     """
-    y = np.log(rates)
-    for n in range(len(temps[0])):
-        x = [1/T[n] for T in temps]
-        s, i, r, p, e = linregress(x, y)
-        yield -s * R / .457, i, r, p, e
- 
-def nonlinear(eas, t1, t2, kind="First", optimizer="Powell", verbose=False):
+    x = 1 / np.asarray(temps, dtype=float)
+    y = np.log(rates)[:, np.newaxis]
+    s, i, r, p, e = _linregress(x, y)
+    return np.column_stack((-s * R / 1.052, i, r, p, e))
+
+def ni_kas(rates, temps):
+    """
+    Non-isothermal, Integral: Kissinger-Akahira-Sunose isoconversional 
+    method. It uses Murray and White's approximation.
+    """
+    temps = np.asarray(temps, dtype=float)
+    x = 1 / temps
+    y = np.log(np.asarray(rates, dtype=float)[:, np.newaxis] / temps**2)
+    s, i, r, p, e = _linregress(x, y)
+    return np.column_stack((-s * R, i, r, p, e))
+
+def ni_friedman(rates, temps, alphas):
+    """
+    Non-isothermal, Differential: Friedman isoconversional method.
+    
+    Parameters
+    ----------
+    rates : iterable
+        Heating rates.
+    temps : iterable
+        Temperatures (rate x alpha).
+    alphas : iterable
+        Conversion levels of the temperature columns, used for the 
+        conversion rates dalpha/dT.
+    """
+    temps = np.asarray(temps, dtype=float)
+    dadT = np.gradient(np.asarray(alphas, dtype=float), axis=-1) / \
+        np.gradient(temps, axis=-1)
+    x = 1 / temps
+    y = np.log(np.asarray(rates, dtype=float)[:, np.newaxis] * dadT)
+    s, i, r, p, e = _linregress(x, y)
+    return np.column_stack((-s * R, i, r, p, e))
+
+def _linregress(x, y):
+    """
+    linregress over the first axis (runs) of x and y, for every alpha 
+    column at once. Returns slope, intercept, r, two-sided p-value and 
+    slope standard error arrays.
+    """
+    x, y = np.broadcast_arrays(x, y)
+    n = x.shape[0]
+    dx = x - x.mean(axis=0)
+    dy = y - y.mean(axis=0)
+    sxx, syy = (dx**2).sum(axis=0), (dy**2).sum(axis=0)
+    sxy = (dx * dy).sum(axis=0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sxy / sxx
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1, 1)
+        df = n - 2
+        stderr = np.sqrt((1 - r**2) * syy / sxx / df)
+        t = r * np.sqrt(df / ((1 - r) * (1 + r)))
+        p = 2 * student_t.sf(np.abs(t), df) if df > 0 else np.nan * r
+    return slope, y.mean(axis=0) - slope * x.mean(axis=0), r, p, stderr
+
+_GRADIENT_METHODS = ('cg', 'bfgs', 'newton-cg', 'l-bfgs-b', 'tnc', 'slsqp')
+
+def nonlinear(eas, t1, t2, kind="First", optimizer="Powell", verbose=False,
+              options=None):
     """
     Non-linear isoconversional method (Vyazovkin's Method).
     
-    First: Linear heating using Senum & Yang's approximation.
-    Isothermal: The modified method, adapted for isothermal conditions.
+    First: Linear heating using Senum & Yang's approximation. t1 are the 
+        heating rates and t2 the temperatures (rate x alpha).
+    Isothermal: The modified method, adapted for isothermal conditions. t1 
+        are the times (temperature x alpha) and t2 the temperatures.
+    
+    Inside a helpers.profile block, every call records its objective and
+    gradient evaluation counts and the objective values.
+    
+    The optimizer works on Ea/Ea0 (Ea0 being eas), where the objective's
+    gradient is of order one instead of about 1e-5 in J/mol units, so 
+    default tolerances converge. Gradient-based optimizers (BFGS, L-BFGS-B,
+    CG...) receive the analytic gradient of the objective function. The 
+    result's x and jac are given back in J/mol.
     """
-    if kind == "First":
-        return minimize(_vkin_fast, eas, args=(t1, t2), method=optimizer)
-    elif kind == "Isothermal":
-        return minimize(_vkin_mod_iso, eas, args(t1, t2), method=optimizer)
-    else:
+    if kind not in _OBJECTIVES:
         raise NotImplementedError("kind parameter not recognized")
+    
+    objective, gradient = _OBJECTIVES[kind]
+    eas = np.asarray(eas, dtype=float)
+    scale = np.where(eas != 0, np.abs(eas), 1e3)
+    
+    def scaled_objective(u, t1, t2):
+        return objective(u * scale, t1, t2)
+    
+    def scaled_gradient(u, t1, t2):
+        return gradient(u * scale, t1, t2) * scale
+    
+    with track("nonlinear", kind=kind, optimizer=str(optimizer),
+               size=np.size(eas)) as record:
+        fun = record.counted(scaled_objective, 'fun', trace=True)
+        if str(optimizer).lower() in _GRADIENT_METHODS:
+            jac = record.counted(scaled_gradient, 'jac')
+        else:
+            jac = None
+        with record.stage('minimize'):
+            res = minimize(fun, eas / scale, args=(t1, t2), method=optimizer,
+                           jac=jac, options=options)
+        res.x = res.x * scale
+        if 'jac' in res:
+            res.jac = res.jac / scale
+        record.update(success=bool(res.success), nit=res.get('nit'),
+                      nfev=res.get('nfev'), fun=float(res.fun),
+                      message=str(res.message))
+    return res
+
+def nonlinear_pointwise(t1, t2, kind="First", bounds=(1e3, 1e6), xatol=1e-3,
+                        processes=None, chunksize=None):
+    """
+    Non-linear isoconversional method (Vyazovkin's Method), solved as one
+    bounded scalar minimization per alpha instead of a single minimization
+    over the whole Ea vector.
+    
+    Parameters
+    ----------
+    t1, t2 : iterable
+        Same as nonlinear, depending on kind.
+    kind : str
+        Same as nonlinear.
+    bounds : tuple
+        Activation energy search interval (J/mol).
+    xatol : float
+        Absolute tolerance on each activation energy (J/mol).
+    processes : int (optional)
+        Worker processes. Defaults to the CPU count, 1 runs serially.
+    chunksize : int (optional)
+        Alpha values sent to a worker at once. Defaults to an even split in
+        four chunks per worker.
+    
+    Returns
+    -------
+    ndarray with one (Ea, objective value, success, evaluations) row per
+    alpha value.
+    """
+    if kind not in _OBJECTIVES:
+        raise NotImplementedError("kind parameter not recognized")
+    
+    t1 = np.asarray(t1, dtype=float)
+    t2 = np.asarray(t2, dtype=float)
+    size = t2.shape[1] if kind == "First" else t1.shape[1]
+    
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, -(-size // (4 * processes)))
+    
+    tasks = []
+    for n in range(0, size, chunksize):
+        if kind == "First":
+            tasks.append((kind, t1, t2[:, n:n+chunksize], bounds, xatol))
+        else:
+            tasks.append((kind, t1[:, n:n+chunksize], t2, bounds, xatol))
+    
+    if processes == 1:
+        chunks = [_vkin_solve_chunk(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            chunks = pool.map(_vkin_solve_chunk, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    
+    return np.vstack(chunks)
+
+def _vkin_solve_chunk(task):
+    """nonlinear_pointwise's worker: solves a block of alpha columns."""
+    kind, t1, t2, bounds, xatol = task
+    objective, _ = _OBJECTIVES[kind]
+    size = t2.shape[1] if kind == "First" else t1.shape[1]
+    rows = []
+    for n in range(size):
+        if kind == "First":
+            args = (t1, t2[:, n:n+1])
+        else:
+            args = (t1[:, n:n+1], t2)
+        res = minimize_scalar(lambda Ea: objective([Ea], *args), bounds=bounds,
+                              method="bounded", options={'xatol': xatol})
+        rows.append((res.x, res.fun, res.success, res.nfev))
+    return np.array(rows, dtype=float).reshape(-1, 4)
  
 def _vkin_multiple(eas, t1, t2, kind="Fast", verbose=False):
-    total = 0
-    
-    for n, Ea in enumerate(eas):
-        for i, j in itertools.permutations(range(len(t1)), 2):
-            
-            if kind == "Fast":
-                b = t1; T = t2
-                Iai = senumyang(Ea / (R * T[i][n]))
-                Iaj = senumyang(Ea / (R * T[j][n]))
-                total += (b[j] * Iai) / (b[i] * Iaj)
-            
-            elif kind == "Isothermal":
-                times = t1; temps = t2
-                Jai = quad(timeint, 0, times[i][n], args=(Ea, temps[i]))
-                Jaj = quad(timeint, 0, times[j][n], args=(Ea, temps[j]))
-                total += Jai[0] / Jaj[0]
-            
-            else:
-                raise NotImplementedError
+    if kind == "Fast":
+        total = _vkin_fast(eas, t1, t2)
+    elif kind == "Isothermal":
+        total = _vkin_mod_iso(eas, t1, t2)
+    else:
+        raise NotImplementedError
     
     if verbose:
         print total, eas
     
     return total
+
+def _vkin_pairs(logs):
+    """
+    Pairwise ratios[i, j, n] = exp(logs[i][n] - logs[j][n]) of the 
+    (run x alpha) log-integrals, zero for i == j.
+    """
+    ratios = np.exp(logs[:, np.newaxis, :] - logs[np.newaxis, :, :])
+    diagonal = np.arange(len(logs))
+    ratios[diagonal, diagonal] = 0
+    return ratios
+
+def _vkin_pairs_grad(ratios, dlogs):
+    """Gradient of _vkin_pairs(logs).sum() given d logs[i][n] / dEa[n]."""
+    return (dlogs * ratios.sum(axis=1)).sum(axis=0) - \
+           (dlogs * ratios.sum(axis=0)).sum(axis=0)
+ 
+def _vkin_fast_logs(eas, b, T):
+    """
+    log(I(Ea[n], T[i][n]) / b[i]) and its derivative with respect to Ea[n],
+    both with shape (rate, alpha).
+    """
+    eas = np.asarray(eas, dtype=float)
+    T = np.asarray(T, dtype=float)
+    x = eas / (R * T)
+    logs = senumyang_log(x) - np.log(b)[:, np.newaxis]
+    return logs, senumyang_dlog(x) * x / eas
  
 def _vkin_fast(eas, b, T):
     """
     Vyazovkin's first isoconventional method (objective function) for linear
     non-isothermal reactions. Uses Senum-Yang's approximation.
     """
-    total = 0
-    for n, Ea in enumerate(eas):
-        for i, j in itertools.permutations(range(len(b)), 2):
-            Iai = senumyang(Ea / (R * T[i][n]))
-            Iaj = senumyang(Ea / (R * T[j][n]))
-            total += (b[j] * Iai) / (b[i] * Iaj)
-    return total
+    logs, _ = _vkin_fast_logs(eas, b, T)
+    return _vkin_pairs(logs).sum()
 
-def _timeint(t, Ea, T):
-    """Integral for vkin_iso"""
-    return np.exp(-Ea / (R*T))
+def _vkin_fast_grad(eas, b, T):
+    """Analytic gradient of _vkin_fast with respect to eas."""
+    logs, dlogs = _vkin_fast_logs(eas, b, T)
+    return _vkin_pairs_grad(_vkin_pairs(logs), dlogs)
+
+def _vkin_iso_logs(eas, times, temps):
+    """
+    log(J(Ea[n], times[i][n], temps[i])) and its derivative with respect to 
+    Ea[n], both with shape (temperature, alpha).
+    """
+    eas = np.asarray(eas, dtype=float)
+    inverse = 1 / (R * np.asarray(temps, dtype=float))[:, np.newaxis]
+    logs = np.log(times) - eas * inverse
+    return logs, np.broadcast_to(-inverse, logs.shape)
 
 def _vkin_mod_iso(eas, times, temps):
-    total = 0
-    for n, Ea in enumerate(eas):
-        for i, j in itertools.permutations(range(len(temps)), 2):
-            Jai = quad(timeint, 0, times[i][n], args=(Ea, temps[i]))
-            Jaj = quad(timeint, 0, times[j][n], args=(Ea, temps[j]))
-            total += Jai[0] / Jaj[0]
-    print total, eas
-    return total            
-
-def _vkin_mod_iso2(eas, times, temps):
-    total = 0
-    for n, Ea in enumerate(eas):
-        for i, j in itertools.permutations(range(len(temps)), 2):
-            Jai = quad(timeint, 0, times[i][n], args=(Ea, temps[i]))
-            Jaj = quad(timeint, 0, times[j][n], args=(Ea, temps[j]))
-            total += Jai[0] / Jaj[0]
-    print total, eas
-    return total
+    """
+    Vyazovkin's modified method (objective function) for isothermal 
+    reactions. The time integral is evaluated in closed form.
+    """
+    logs, _ = _vkin_iso_logs(eas, times, temps)
+    return _vkin_pairs(logs).sum()
+
+def _vkin_mod_iso_grad(eas, times, temps):
+    """Analytic gradient of _vkin_mod_iso with respect to eas."""
+    logs, dlogs = _vkin_iso_logs(eas, times, temps)
+    return _vkin_pairs_grad(_vkin_pairs(logs), dlogs)
+
+_OBJECTIVES = {
+    "First": (_vkin_fast, _vkin_fast_grad),
+    "Isothermal": (_vkin_mod_iso, _vkin_mod_iso_grad),
+}
@@ -0,0 +1,238 @@
+"""
+Uncertainty estimates for isoconversional activation energies.
+
+* bootstrap reruns a method on many replicates of the data, made by
+  resampling runs with replacement, by adding gaussian noise to the
+  measured (run x alpha) array, or both. jackknife reruns it leaving one
+  run out at a time.
+
+* The data is sent once to every worker process through the pool
+  initializer (_init_worker), not once per task; tasks only carry a block
+  of replicate numbers and a seed. Seeds are drawn in the parent, so the
+  replicates do not depend on the number of processes.
+
+* "vyazovkin" solves all alpha values at once (_vyazovkin) instead of
+  calling nonlinear_pointwise, which takes one scalar minimization each.
+
+* Replicates that draw a single distinct run can't be fitted and give nan,
+  which is ignored by the percentile bands.
+"""
+
+from __future__ import division
+import collections
+import multiprocessing
+import numpy as np
+
+from .api import ii_standard, ni_ofw, ni_kas, ni_friedman, _OBJECTIVES
+
+__all__ = ['Bands', 'bootstrap', 'jackknife']
+
+Bands = collections.namedtuple(
+    'Bands', ['estimate', 'lower', 'upper', 'samples'])
+
+def _vyazovkin(t1, t2, kind="First", bounds=(1e3, 1e6), xatol=1e-3):
+    """
+    Same solution as nonlinear_pointwise, as one bisection on the sign of
+    the objective's gradient for all alpha values at once: every gradient
+    component only depends on its own Ea.
+    """
+    if kind not in _OBJECTIVES:
+        raise NotImplementedError("kind parameter not recognized")
+    _, gradient = _OBJECTIVES[kind]
+    size = np.shape(t2)[1] if kind == "First" else np.shape(t1)[1]
+    low = np.full(size, bounds[0], dtype=float)
+    high = np.full(size, bounds[1], dtype=float)
+
+    for _ in range(int(np.ceil(np.log2((bounds[1] - bounds[0]) / xatol)))):
+        middle = (low + high) / 2
+        rising = gradient(middle, t1, t2) > 0
+        high = np.where(rising, middle, high)
+        low = np.where(rising, low, middle)
+    return ((low + high) / 2)[:, np.newaxis]
+
+# (function, index of the (run x alpha) measured argument); "vyazovkin"
+# measures times (t1) with kind="Isothermal", see _shared
+_METHODS = {
+    'standard': (ii_standard, 0),
+    'ofw': (ni_ofw, 1),
+    'kas': (ni_kas, 1),
+    'friedman': (ni_friedman, 1),
+    'vyazovkin': (_vyazovkin, 1)
+}
+
+_SHARED = {}
+
+def bootstrap(method, t1, t2, replicates=200, resample="runs", noise=0,
+              level=0.95, seed=None, processes=None, chunksize=None,
+              **kwargs):
+    """
+    Bootstrap confidence bands for Ea(alpha).
+
+    Parameters
+    ----------
+    method : str
+        "standard" (ii_standard), "ofw", "kas", "friedman" or "vyazovkin"
+        (same solution as nonlinear_pointwise).
+    t1, t2 : iterable
+        The method's data arguments, e.g. heating rates and temperatures
+        (rate x alpha) for "ofw", or times (temperature x alpha) and
+        temperatures for "vyazovkin" with kind="Isothermal".
+    replicates : int
+        Number of bootstrap replicates.
+    resample : str
+        "runs" (resampled with replacement), "noise" (gaussian noise added
+        to the measured array) or "both".
+    noise : float or ndarray
+        Noise standard deviation, in the units of the measured array
+        (temperatures or times). Either a scalar or one value per run.
+    level : float
+        Confidence level of the bands.
+    seed : int (optional)
+        Random seed.
+    processes : int (optional)
+        Worker processes. Defaults to the CPU count, 1 runs serially.
+    chunksize : int (optional)
+        Replicates sent to a worker at once. Defaults to an even split in
+        four chunks per worker.
+    kwargs
+        Extra arguments of the method (alphas for "friedman", kind and
+        bounds for "vyazovkin").
+
+    Returns
+    -------
+    Bands with the point estimate, the lower and upper band limits (one
+    value per alpha) and the Ea samples (replicate x alpha).
+    """
+    if resample not in ("runs", "noise", "both"):
+        raise NotImplementedError("resample parameter not recognized")
+
+    shared = _shared(method, t1, t2, kwargs)
+    shared.update(resample=resample, noise=noise)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, -(-replicates // (4 * processes)))
+
+    seeds = np.random.RandomState(seed).randint(2**31 - 1, size=replicates)
+    tasks = [(n, seeds[n:n+chunksize]) for n in range(0, replicates, chunksize)]
+    samples = _run(_bootstrap_task, tasks, shared, processes)
+
+    tail = 50 * (1 - level)
+    with np.errstate(invalid='ignore'):
+        lower, upper = np.nanpercentile(samples, [tail, 100 - tail], axis=0)
+    return Bands(_estimate(shared), lower, upper, samples)
+
+def jackknife(method, t1, t2, level=0.95, processes=1, **kwargs):
+    """
+    Jackknife (leave one run out) confidence bands for Ea(alpha).
+
+    Parameters
+    ----------
+    method, t1, t2, kwargs
+        Same as bootstrap.
+    level : float
+        Confidence level of the bands, from a normal approximation with
+        the jackknife standard error.
+    processes : int (optional)
+        Worker processes, 1 (serial) by default since there are as many
+        replicates as runs.
+
+    Returns
+    -------
+    Bands, as in bootstrap, with one sample per omitted run.
+    """
+    from scipy.stats import norm
+
+    shared = _shared(method, t1, t2, kwargs)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    runs = len(shared['args'][shared['measured']])
+    samples = _run(_jackknife_task, [(n, [n]) for n in range(runs)], shared,
+                   processes)
+
+    estimate = _estimate(shared)
+    stderr = np.sqrt((runs - 1) / runs *
+                     ((samples - samples.mean(axis=0))**2).sum(axis=0))
+    z = norm.ppf(0.5 + level / 2)
+    return Bands(estimate, estimate - z * stderr, estimate + z * stderr,
+                 samples)
+
+def _shared(method, t1, t2, kwargs):
+    """The data every replicate of a method is computed from."""
+    if method not in _METHODS:
+        raise NotImplementedError("method parameter not recognized")
+    func, measured = _METHODS[method]
+    if method == 'vyazovkin' and kwargs.get('kind') == "Isothermal":
+        measured = 0
+    args = [np.asarray(t1, dtype=float), np.asarray(t2, dtype=float)]
+    return dict(func=func, measured=measured, args=args, kwargs=kwargs)
+
+def _estimate(shared, args=None):
+    """Ea(alpha) from the method, for the original or a replicate's data."""
+    args = shared['args'] if args is None else args
+    return shared['func'](*args, **shared['kwargs'])[:, 0]
+
+def _run(worker, tasks, shared, processes):
+    """Runs replicate tasks and stacks their Ea arrays in task order."""
+    if processes == 1:
+        _init_worker(shared)
+        try:
+            chunks = [worker(task) for task in tasks]
+        finally:
+            _SHARED.clear()
+    else:
+        pool = multiprocessing.Pool(processes, _init_worker, (shared,))
+        try:
+            chunks = pool.map(worker, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    return np.vstack([chunk for _, chunk in sorted(chunks)])
+
+def _init_worker(shared):
+    """Pool initializer: keeps the method and data in the worker."""
+    _SHARED.update(shared)
+
+def _bootstrap_task(task):
+    """bootstrap's worker: computes a block of replicates."""
+    start, seeds = task
+    args, measured = _SHARED['args'], _SHARED['measured']
+    runs = len(args[measured])
+    noise = np.reshape(_SHARED['noise'], (-1, 1))
+    samples = []
+
+    for seed in seeds:
+        state = np.random.RandomState(seed)
+        picked = np.arange(runs)
+        if _SHARED['resample'] in ("runs", "both"):
+            picked = state.randint(runs, size=runs)
+        replicate = [arg[picked] if arg.ndim else arg for arg in args]
+        if _SHARED['resample'] in ("noise", "both"):
+            data = replicate[measured]
+            scale = noise[picked] if len(noise) > 1 else noise
+            replicate[measured] = data + scale * state.standard_normal(data.shape)
+        if len(np.unique(picked)) < 2:
+            samples.append(np.full(args[measured].shape[1], np.nan))
+            continue
+        samples.append(_fit(replicate))
+
+    return start, np.array(samples)
+
+def _jackknife_task(task):
+    """jackknife's worker: computes the replicates without the given runs."""
+    start, omitted = task
+    args = _SHARED['args']
+    runs = len(args[_SHARED['measured']])
+    samples = []
+
+    for n in omitted:
+        kept = np.delete(np.arange(runs), n)
+        samples.append(_fit([arg[kept] if arg.ndim else arg for arg in args]))
+
+    return start, np.array(samples)
+
+def _fit(args):
+    """Ea(alpha) of a replicate, nan where the method fails."""
+    with np.errstate(all='ignore'):
+        return _estimate(_SHARED, args)
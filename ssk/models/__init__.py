@@ -3,6 +3,11 @@ This submodule collects several kinetic models, static and customizable.
 For complex process simulation, though, you might have to write custom
 differential equations.
 
+The standard models are collected in registry, which evaluates all of them
+over an alpha array in one call. fitting ranks them (and Sestak-Berggren)
+against experimental curves. The empirical models (Sestak-Berggren, KJMA)
+broadcast over whole parameter grids.
+
 Literature.
 
 Basics and applications of solid-state kinetics: A pharmaceutical perspective
@@ -11,4 +16,6 @@ http://onlinelibrary.wiley.com/doi/10.1002/jps.20559/abstract
 
 from empirical import *
 from theoretical import *
+from registry import *
+from fitting import *
 
@@ -1,10 +1,95 @@
+"""
+Empirical kinetic models.
+
+* Parameters can be scalars or arrays. They are broadcast against each
+  other into a parameter grid, and the result has shape (grid + alpha), so
+  a whole parameter scan is a single call:
+
+      n, m = np.ix_(np.linspace(0, 2, 201), np.linspace(0, 3, 301))
+      rates = sb(alphas, n, m)        # (201, 301, len(alphas))
+
+* multistep adds up independent parallel steps, given as the last axis of
+  the parameter grid.
+"""
+
+from __future__ import division
 import numpy as np
 
-def kjma(t, n):
-    pass # TODO
+__all__ = ['sb', 'kjma', 'multistep']
+
+def _grid(x, *params):
+    """
+    Broadcasts params into one grid, with trailing axes for x, so that
+    results have shape grid.shape + x.shape.
+    """
+    x = _float(x)
+    params = np.broadcast_arrays(*[_float(p) for p in params])
+    shape = params[0].shape + (1,) * x.ndim
+    return [x] + [p.reshape(shape) for p in params]
+
+def _float(x):
+    """x as a float array, or complex (complex step derivatives)."""
+    x = np.asarray(x)
+    return np.asarray(x, dtype=np.result_type(x, float))
+
+def kjma(t, k, n):
+    """
+    Kolmogorov-Johnson-Mehl-Avrami model: alpha = 1 - exp(-(k*t)**n).
+
+    Parameters
+    ----------
+    t : ndarray
+        Times.
+    k : float or ndarray
+        Rate constants.
+    n : float or ndarray
+        Avrami exponents.
+
+    Returns
+    -------
+    Transformed fractions with shape (parameter grid + t).
+    """
+    t, k, n = _grid(t, k, n)
+    return -np.expm1(-(k * t)**n)
 
 def sb(a, n=0, m=0, p=0):
-    if p == 0:
-        return a**n * (1-a)**m * (-np.log(1-a))**p
-    else:
-        return a**n * (1-a)**m
+    """
+    Sestak-Berggren model (differential form):
+    f(alpha) = alpha**n * (1 - alpha)**m * (-ln(1 - alpha))**p.
+
+    Parameters
+    ----------
+    a : ndarray
+        Transformed fractions.
+    n, m, p : float or ndarray
+        Exponents.
+
+    Returns
+    -------
+    ndarray with shape (parameter grid + a).
+    """
+    a, n, m, p = _grid(a, n, m, p)
+    with np.errstate(divide='ignore'):
+        f = a**n * (1 - a)**m
+        if np.any(p != 0):
+            f = f * (-np.log1p(-a))**p
+    return f
+
+def multistep(values, weights):
+    """
+    Weighted sum of independent parallel steps.
+
+    Parameters
+    ----------
+    values : ndarray
+        Output of sb or kjma for 1-D alphas or times, whose parameter grid
+        has one step per position of its last axis: (..., step, alpha).
+    weights : ndarray
+        Step weights, with shape (step,) or matching the grid (..., step).
+
+    Returns
+    -------
+    ndarray with shape (..., alpha).
+    """
+    weights = np.asarray(weights, dtype=float)
+    return (values * weights[..., np.newaxis]).sum(axis=-2)
@@ -1,3 +1,370 @@
+"""
+Model fitting and discrimination.
 
+* coats_redfern and isothermal fit every model of the registry at once, as
+  a batched least squares over the (model x alpha) matrix of g(alpha).
+
+* fit_models refines the best linearized candidates by nonlinear least
+  squares on the simulated temperatures, and ranks them together with a
+  Sestak-Berggren fit (see sestak_berggren) by residual.
+
+* fit_triplet fits (A, E, model parameters) to the curves of all heating
+  rates at once. Temperatures are simulated for the whole (rate x alpha)
+  array with senumyang_inverse, and their sensitivities are analytic: with
+  x = E/(R*T) and L = ln p(x), L(x) = ln(g*rate*R/(A*E)) gives
+  dT/dlnA = E/(R*x**2*L'), dT/dE = 1/(R*x) + 1/(R*x**2*L') and
+  dT/dtheta = -E/(R*x**2*L') * dln(g)/dtheta, the last one from a complex
+  step derivative of the model. It starts from the ni_ofw activation
+  energies and the A value they imply for the model.
+"""
+
+from __future__ import division
+import collections
 import numpy as np
 from scipy import optimize
+from scipy.constants import R
+from scipy.integrate import cumtrapz
+
+from ..ti import senumyang_inverse, senumyang_log, senumyang_dlog
+from .empirical import sb
+from .registry import registry
+
+__all__ = [
+    'FitResult',
+    'coats_redfern',
+    'isothermal',
+    'sestak_berggren',
+    'fit_models',
+    'fit_triplet',
+    'fit_triplets'
+]
+
+FitResult = collections.namedtuple(
+    'FitResult', ['name', 'A', 'E', 'params', 'r', 'ssr'])
+
+def coats_redfern(alphas, temps, rate, names=None):
+    """
+    Non-isothermal, linearized model fitting (Coats-Redfern method):
+    ln(g(alpha)/T**2) = ln(A*R/(rate*E)) - E/(R*T), for every model.
+
+    Parameters
+    ----------
+    alphas : ndarray
+        Transformed fraction values.
+    temps : ndarray
+        Absolute temperatures associated with alphas.
+    rate : float or int
+        Linear heating rate.
+    names : iterable (optional)
+        Registry models to fit, all of them by default.
+
+    Returns
+    -------
+    ndarray with one (E, A, r, ssr) row per model, in registry order. ssr
+    is the residual of the linearized fit.
+    """
+    temps = np.asarray(temps, dtype=float)
+    with np.errstate(all='ignore'):
+        y = np.log(registry.integral(alphas, names) / temps**2)
+    s, i, r, ssr = _masked_linregress(1 / temps, y)
+    E = -s * R
+    return np.column_stack((E, rate * E / R * np.exp(i), r, ssr))
+
+def isothermal(alphas, times, names=None):
+    """
+    Isothermal model fitting: g(alpha) = k*t, for every model. The rate
+    constant minimizing the squared time residuals has a closed form, so
+    no refinement is needed.
+
+    Parameters
+    ----------
+    alphas : ndarray
+        Transformed fraction values.
+    times : ndarray
+        Times associated with alphas.
+    names : iterable (optional)
+        Registry models to fit, all of them by default.
+
+    Returns
+    -------
+    ndarray with one (k, r, ssr) row per model, in registry order. ssr is
+    the residual on times.
+    """
+    t = np.asarray(times, dtype=float)
+    g = registry.integral(alphas, names)
+    mask = np.isfinite(g)
+    g, t = np.where(mask, g, 0), np.where(mask, t, 0)
+
+    with np.errstate(all='ignore'):
+        k = (g**2).sum(axis=1) / (g * t).sum(axis=1)
+        ssr = ((g / k[:, np.newaxis] - t)**2 * mask).sum(axis=1)
+        n = mask.sum(axis=1)
+        mean = t.sum(axis=1) / n
+        sst = ((t - mean[:, np.newaxis])**2 * mask).sum(axis=1)
+        r = np.sqrt(np.clip(1 - ssr / sst, 0, 1))
+
+    return np.column_stack((k, r, ssr))
+
+def sestak_berggren(alphas, temps, rate):
+    """
+    Non-isothermal Sestak-Berggren fit from the linear form
+    ln(rate * dalpha/dT) = ln(A) + n*ln(alpha) + m*ln(1-alpha) - E/(R*T),
+    with dalpha/dT taken from the data. The p exponent is kept at zero, as
+    it is nearly collinear with n.
+
+    Returns
+    -------
+    FitResult, with (n, m, p) as params. ssr is the residual of the
+    linearized fit.
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    with np.errstate(all='ignore'):
+        y = np.log(rate * np.gradient(alphas, temps))
+    X = np.column_stack((np.ones_like(alphas), np.log(alphas),
+                         np.log(1 - alphas), -1 / (R * temps)))
+    mask = np.isfinite(y) & np.all(np.isfinite(X), axis=1)
+
+    coef, res, _, _ = np.linalg.lstsq(X[mask], y[mask], rcond=None)
+    ssr = ((np.dot(X[mask], coef) - y[mask])**2).sum()
+    r = np.sqrt(max(0, 1 - ssr / ((y[mask] - y[mask].mean())**2).sum()))
+    return FitResult('SB', np.exp(coef[0]), coef[3], (coef[1], coef[2], 0),
+                     r, ssr)
+
+def fit_models(alphas, temps, rate, top=3, names=None, include_sb=True):
+    """
+    Ranks kinetic models against a linear non-isothermal curve.
+
+    Every model is fitted with coats_redfern first. The top candidates (by
+    correlation coefficient) and the Sestak-Berggren fit are then refined by
+    nonlinear least squares on the temperatures simulated with the
+    Senum-Yang approximation.
+
+    Parameters
+    ----------
+    alphas : ndarray
+        Transformed fraction values.
+    temps : ndarray
+        Absolute temperatures associated with alphas.
+    rate : float or int
+        Linear heating rate.
+    top : int
+        Number of models refined after the linearized pass.
+    names : iterable (optional)
+        Registry models to consider, all of them by default.
+    include_sb : boolean
+        Also refine and rank a Sestak-Berggren model.
+
+    Returns
+    -------
+    List of FitResult sorted by ssr, the sum of squared temperature
+    residuals (K**2); r is the correlation of the refined temperatures.
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    names = registry.names if names is None else list(names)
+
+    linear = coats_redfern(alphas, temps, rate, names)
+    order = np.argsort(-np.nan_to_num(np.abs(linear[:, 2])))
+
+    results = []
+    for n in order[:top]:
+        E, A = linear[n, :2]
+        g = registry[names[n]].integral
+        results.append(_refine(names[n], g, alphas, temps, rate, A, E))
+
+    if include_sb:
+        # the linear fit depends on noisy derivatives, so SB is also started
+        # from the first order model it contains: sb(alpha, 0, 1) = F1
+        first = sestak_berggren(alphas, temps, rate)
+        E, A = coats_redfern(alphas, temps, rate, ['F1'])[0, :2]
+        starts = [(first.A, first.E, first.params[:2]), (A, E, (0, 1))]
+        results.append(min((_refine('SB', _sb_integral, alphas, temps, rate,
+                                    *start) for start in starts),
+                           key=lambda result: result.ssr))
+
+    return sorted(results, key=lambda result: result.ssr)
+
+def _refine(name, g, alphas, temps, rate, A, E, params=()):
+    """Nonlinear least squares of (ln A, E, *params) on temperatures."""
+    mask = (alphas > 0) & (alphas < 1)
+    alphas, temps = alphas[mask], temps[mask]
+
+    def residuals(theta):
+        lnA, E = theta[:2]
+        with np.errstate(all='ignore'):
+            y = g(alphas, *theta[2:]) * rate * R / (np.exp(lnA) * E)
+            simulated = E / (R * senumyang_inverse(y))
+        # curves that cannot be simulated count as T = 0
+        return np.where(np.isfinite(simulated), simulated, 0) - temps
+
+    E = max(E, 1e3) if np.isfinite(E) else 1e5
+    A = A if np.isfinite(A) and A > 0 else 1
+    x0 = np.r_[np.log(A), E, params]
+    scale = np.r_[1, E, np.ones(len(params))]
+    lower = np.r_[-np.inf, 1, np.full(len(params), -np.inf)]
+    res = optimize.least_squares(residuals, x0, x_scale=scale,
+                                 bounds=(lower, np.inf))
+
+    ssr = 2 * res.cost
+    r = np.sqrt(max(0, 1 - ssr / ((temps - temps.mean())**2).sum()))
+    return FitResult(name, np.exp(res.x[0]), res.x[1], tuple(res.x[2:]), r,
+                     ssr)
+
+def _sb_integral(alphas, n, m):
+    """Integral form of sb(alpha, n, m), by trapezoids over alphas."""
+    inverse = 1 / sb(alphas, n, m)
+    return cumtrapz(inverse, alphas, initial=0) + alphas[0] * inverse[0]
+
+def _masked_linregress(x, y):
+    """
+    Row-wise least squares of y (row, point) against x (point), skipping
+    non-finite values. Returns slope, intercept, r and residual arrays.
+    """
+    mask = np.isfinite(y)
+    w = mask.astype(float)
+    y = np.where(mask, y, 0)
+
+    with np.errstate(all='ignore'):
+        n = w.sum(axis=1)
+        mx = (w * x).sum(axis=1) / n
+        my = (w * y).sum(axis=1) / n
+        dx = (x - mx[:, np.newaxis]) * w
+        dy = (y - my[:, np.newaxis]) * w
+        sxx, syy = (dx**2).sum(axis=1), (dy**2).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        slope = sxy / sxx
+        r = sxy / np.sqrt(sxx * syy)
+        ssr = syy - slope * sxy
+
+    bad = n < 3
+    slope[bad], r[bad], ssr[bad] = np.nan, np.nan, np.nan
+    return slope, my - slope * mx, r, ssr
+
+def fit_triplet(alphas, temps, rates, model, params=(), A=None, E=None):
+    """
+    Global fit of the kinetic triplet to linear non-isothermal curves at
+    several heating rates, by nonlinear least squares on temperatures.
+
+    Parameters
+    ----------
+    alphas : ndarray
+        Transformed fraction values, shared by all curves.
+    temps : ndarray
+        Absolute temperatures (rate x alpha), as used by the
+        isoconversional methods.
+    rates : iterable
+        Linear heating rates.
+    model : str or callable
+        Registry model name, "SB" (Sestak-Berggren, integrated numerically,
+        params (n, m)) or an integral model g(alpha, *params). Callables
+        with params must accept complex parameters.
+    params : iterable
+        Initial model parameters.
+    A, E : float (optional)
+        Initial pre-exponential factor and activation energy. By default E
+        is the median ni_ofw activation energy, and A the median value
+        implied by E and the model at every point.
+
+    Returns
+    -------
+    FitResult. ssr is the sum of squared temperature residuals (K**2) over
+    all curves, and r the correlation coefficient of simulated and
+    measured temperatures.
+    """
+    from ..isoconversional import ni_ofw
+
+    alphas = np.asarray(alphas, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    rates = np.asarray(rates, dtype=float)[:, np.newaxis]
+    if model == "SB":
+        name, g = model, _sb_integral
+        params = params or (0, 1)
+    elif callable(model):
+        name, g = getattr(model, '__name__', 'model'), model
+    else:
+        name, g = model, registry[model].integral
+    params = np.asarray(params, dtype=float)
+
+    mask = (alphas > 0) & (alphas < 1)
+    alphas, temps = alphas[mask], temps[:, mask]
+    data = np.isfinite(temps)
+
+    if E is None:
+        E = np.nanmedian(ni_ofw(rates.ravel(), temps)[:, 0])
+    if A is None:
+        with np.errstate(all='ignore'):
+            lnA = np.log(g(alphas, *params) * rates * R / E) - \
+                senumyang_log(E / (R * temps))
+        A = np.exp(np.nanmedian(lnA[np.isfinite(lnA)]))
+
+    def simulate(theta):
+        lnA, E = theta[:2]
+        with np.errstate(all='ignore'):
+            y = g(alphas, *theta[2:]) * rates * R / (np.exp(lnA) * E)
+            x = senumyang_inverse(y)
+        return x, E / (R * x)
+
+    def residuals(theta):
+        _, simulated = simulate(theta)
+        # curves that cannot be simulated count as T = 0
+        ok = np.isfinite(simulated) & data
+        return np.where(ok, simulated - temps, -np.where(data, temps, 0))[data]
+
+    def jacobian(theta):
+        E = theta[1]
+        x, simulated = simulate(theta)
+        with np.errstate(all='ignore'):
+            dlnA = E / (R * x**2 * senumyang_dlog(x))
+            columns = [dlnA, 1 / (R * x) + dlnA / E]
+            for k in range(len(theta) - 2):
+                step = np.zeros(len(theta) - 2, dtype=complex)
+                step[k] = 1e-20j
+                dlng = np.imag(np.log(g(alphas, *(theta[2:] + step)) + 0j))
+                columns.append(-dlnA * dlng / 1e-20)
+        ok = np.isfinite(simulated) & data
+        columns = [np.where(ok, np.broadcast_to(c, ok.shape), 0)[data]
+                   for c in columns]
+        return np.column_stack(columns)
+
+    x0 = np.r_[np.log(A), E, params]
+    scale = np.r_[1, E, np.ones(len(params))]
+    lower = np.r_[-np.inf, 1, np.full(len(params), -np.inf)]
+    res = optimize.least_squares(residuals, x0, jac=jacobian, x_scale=scale,
+                                 bounds=(lower, np.inf))
+
+    ssr = 2 * res.cost
+    measured = temps[data]
+    r = np.sqrt(max(0, 1 - ssr / ((measured - measured.mean())**2).sum()))
+    return FitResult(name, np.exp(res.x[0]), res.x[1], tuple(res.x[2:]), r,
+                     ssr)
+
+def fit_triplets(alphas, temps, rates, names=None, include_sb=True):
+    """
+    Global fits (fit_triplet) of several models, sorted by ssr.
+
+    Parameters
+    ----------
+    alphas, temps, rates
+        Same as fit_triplet.
+    names : iterable (optional)
+        Registry models to fit, all of them by default.
+    include_sb : boolean
+        Also fit a Sestak-Berggren model.
+
+    Returns
+    -------
+    List of FitResult sorted by ssr.
+    """
+    from ..isoconversional import ni_ofw
+
+    temps = np.asarray(temps, dtype=float)
+    names = registry.names if names is None else list(names)
+    mask = (np.asarray(alphas) > 0) & (np.asarray(alphas) < 1)
+    # shared warm start for every model
+    E = np.nanmedian(ni_ofw(np.ravel(rates), temps[:, mask])[:, 0])
+
+    results = [fit_triplet(alphas, temps, rates, name, E=E) for name in names]
+    if include_sb:
+        results.append(fit_triplet(alphas, temps, rates, "SB", E=E))
+    return sorted(results, key=lambda result: result.ssr)
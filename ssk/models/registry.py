@@ -0,0 +1,108 @@
+"""
+Registry of the standard kinetic models in theoretical.
+
+* Every entry pairs the integral (g) and differential (f) forms of a model
+  with its name, family and valid alpha domain. Domains are open intervals:
+  several forms diverge or vanish at their ends.
+
+* ModelRegistry.integral and ModelRegistry.differential evaluate all (or a
+  selection of) models over an alpha array at once, returning a
+  (model x alpha) matrix.
+"""
+
+from __future__ import division
+import collections
+import numpy as np
+
+from . import theoretical as th
+
+__all__ = ['Model', 'ModelRegistry', 'registry']
+
+Model = collections.namedtuple(
+    'Model', ['name', 'family', 'integral', 'differential', 'domain'])
+
+class ModelRegistry(object):
+    """
+    Ordered collection of Model entries.
+
+    Examples
+    --------
+    alphas = np.linspace(0.01, 0.99, 100)
+    g = registry.integral(alphas)                   # (model, alpha)
+    f = registry.differential(alphas, ['F1', 'A2'])  # (2, alpha)
+    """
+
+    def __init__(self, models=()):
+        self._models = collections.OrderedDict()
+        for model in models:
+            self.register(model)
+
+    def register(self, model):
+        """Adds (or replaces) a Model entry."""
+        self._models[model.name] = model
+
+    def __getitem__(self, name):
+        return self._models[name]
+
+    def __contains__(self, name):
+        return name in self._models
+
+    def __iter__(self):
+        return iter(self._models.values())
+
+    def __len__(self):
+        return len(self._models)
+
+    @property
+    def names(self):
+        return list(self._models)
+
+    def family(self, family):
+        """Names of the models of a given family."""
+        return [m.name for m in self if m.family == family]
+
+    def integral(self, alphas, names=None):
+        """Integral forms evaluated over alphas, shape (model, alpha)."""
+        return self._evaluate('integral', alphas, names)
+
+    def differential(self, alphas, names=None):
+        """Differential forms evaluated over alphas, shape (model, alpha)."""
+        return self._evaluate('differential', alphas, names)
+
+    def _evaluate(self, form, alphas, names):
+        """
+        Evaluates one form of every model. Values outside a model's open
+        domain are nan.
+        """
+        alphas = np.asarray(alphas, dtype=float)
+        models = self if names is None else [self[name] for name in names]
+        out = np.empty((len(models),) + alphas.shape)
+
+        with np.errstate(all='ignore'):
+            for row, model in zip(out, models):
+                low, high = model.domain
+                row[...] = getattr(model, form)(alphas)
+                row[(alphas <= low) | (alphas >= high)] = np.nan
+
+        return out
+
+_OPEN = (0, 1)
+
+registry = ModelRegistry([
+    Model('P2', 'power law', th.iP2, th.dP2, _OPEN),
+    Model('P3', 'power law', th.iP3, th.dP3, _OPEN),
+    Model('P4', 'power law', th.iP4, th.dP4, _OPEN),
+    Model('A2', 'nucleation', th.iA2, th.dA2, _OPEN),
+    Model('A3', 'nucleation', th.iA3, th.dA3, _OPEN),
+    Model('A4', 'nucleation', th.iA4, th.dA4, _OPEN),
+    Model('B1', 'autocatalytic', th.iB1, th.dB1, _OPEN),
+    Model('R2', 'geometrical contraction', th.iR2, th.dR2, _OPEN),
+    Model('R3', 'geometrical contraction', th.iR3, th.dR3, _OPEN),
+    Model('D1', 'diffusion', th.iD1, th.dD1, _OPEN),
+    Model('D2', 'diffusion', th.iD2, th.dD2, _OPEN),
+    Model('D3', 'diffusion', th.iD3, th.dD3, _OPEN),
+    Model('D4', 'diffusion', th.iD4, th.dD4, _OPEN),
+    Model('F1', 'reaction order', th.iF1, th.dF1, _OPEN),
+    Model('F2', 'reaction order', th.iF2, th.dF2, _OPEN),
+    Model('F3', 'reaction order', th.iF3, th.dF3, _OPEN),
+])
@@ -98,7 +98,7 @@ def dD3(a):
     return t1 / t2
     
 def dD4(a):
-    return (3/2 *  (((1-a)**(-1/3))-1)  )
+    return 3 / (2 * ((1-a)**(-1.0/3) - 1))
 
 def dF1(a):
     return (1-a)
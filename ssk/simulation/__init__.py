@@ -1,7 +1,10 @@
 """
 This is the reaction simulation submodule. Single-step reactions are important
 to visualize kinetic models, while composite reactions can give insight on
-complex processes.
+complex processes. Composite mechanisms can be integrated from a user-made
+derivative function (ni_integrate) or from a list of reaction steps 
+(ni_solve). ni_ensemble integrates many parameter sets of a mechanism in
+parallel.
 
 Literature:
 
@@ -9,3 +12,5 @@ TODO
 """
 
 from api import *
+from network import *
+from ensemble import *
@@ -3,25 +3,35 @@ Most functions on this submodule straightfoward and independent one of each
 other.
 
 * single_isothermal depends on psi
+* batch_isothermal and batch_nonisothermal evaluate every model once over 
+  the alphas and broadcast the result against all temperatures/rates.
 * ni_integrate works with a user-made function that can be simplified by
-  using ni_rates
+  using ni_rates. Mechanisms that can be written as a list of steps are 
+  better integrated with network.ni_solve, which builds the right-hand side 
+  and its Jacobian for them.
+* ni_integrate samples a dense solve_ivp solution into preallocated arrays,
+  and stops on an exact event (alpha reaching target) or at T1.
+* single_nonisothermal and ni_integrate report objective or right-hand side
+  evaluations, stage times and solver figures to helpers.profile blocks.
 """
 
 from __future__ import division
 import math
-import itertools
 import functools
 import numpy as np
 from scipy.constants import R
 from scipy.optimize import minimize
-from scipy.integrate import ode
+from scipy.integrate import solve_ivp
 
-from ..ti import senumyang
+from ..helpers.instrument import track
+from ..ti import senumyang, senumyang_inverse
 
 __all__ = [
     'psi',
     'single_isothermal',
     'single_nonisothermal',
+    'batch_isothermal',
+    'batch_nonisothermal',
     'ni_rates',
     'ni_integrate'
 ]
@@ -78,9 +88,9 @@ def single_isothermal(model, A, E, alphas, T):
     A list of simulated time steps sequentially associated with given
     trasformation fraction values.
     """
-    return model(alphas) / A * np.exp(Ea/(R*T))
+    return model(alphas) / A * np.exp(E/(R*T))
 
-def single_nonisothermal(model, A, E, alphas, rate, T0=500, method="Nelder-Mead"):
+def single_nonisothermal(model, A, E, alphas, rate, T0=500, method="Newton"):
     """
     Simulate a linear nonisothermal curve from a single model and given parameters 
     with an optimization procedure.
@@ -98,22 +108,97 @@ def single_nonisothermal(model, A, E, alphas, rate, T0=500, method="Nelder-Mead"
     rate : float or int
         Linear heating rate.
     T0 : float or int
-        Initial temperature guess.
+        Initial temperature guess (only used by the minimize fallback).
     method : str or callable
-        Proxy for optimize.minimize(method=value)
+        "Newton" solves g(alpha)*bR/(AE) = senumyang(E/RT) for the whole
+        alphas array at once. Any other value is a proxy for 
+        optimize.minimize(method=value), run once per alpha over psi.
         
     Returns
     -------
-    A list of simulated temperatures sequentially associated with given
+    ndarray of simulated temperatures sequentially associated with given
     trasformation fraction values.
     
     References
     ----------
     #TODO
     """
-    objfun = functools.partial(psi, g=model)
-    output = [minimize(objfun, T0, args=(a, rate, A, E), method=method) for a in alphas]
-    return [o.x for o in output]
+    with track("single_nonisothermal", method=str(method),
+               size=np.size(alphas)) as record:
+        if method == "Newton":
+            with record.stage('solve'):
+                y = model(np.asarray(alphas, dtype=float)) * (rate*R) / (A*E)
+                temps = E / (R * senumyang_inverse(y))
+            record.update(failed=int(np.isnan(temps).sum()))
+            return temps
+        
+        objfun = record.counted(functools.partial(psi, g=model), 'fun')
+        with record.stage('solve'):
+            output = [minimize(objfun, T0, args=(a, rate, A, E), method=method)
+                      for a in alphas]
+        # one entry per alpha: evaluations needed by each minimization
+        record.trace.extend(o.nfev for o in output)
+        record.update(failed=sum(not o.success for o in output))
+        return np.array([o.x[0] for o in output])
+    
+def batch_isothermal(models, A, E, alphas, temps):
+    """
+    Simulates isothermal curves for several models and temperatures at once.
+    
+    Parameters
+    ----------
+    models : iterable (callable)
+        Integral forms of kinetic models.
+    A : float or ndarray
+        Pre-exponential factor, one for all models or one per model.
+    E : float or ndarray
+        Activation energy (J/mol), one for all models or one per model.
+    alphas : ndarray
+        Transformed fraction values.
+    temps : iterable
+        Absolute temperatures.
+    
+    Returns
+    -------
+    ndarray of simulated times with shape (temperature, model, alpha).
+    """
+    g, A, E = _batch_setup(models, A, E, alphas)
+    temps = np.asarray(temps, dtype=float)[:, np.newaxis, np.newaxis]
+    return g / A * np.exp(E/(R*temps))
+
+def batch_nonisothermal(models, A, E, alphas, rates):
+    """
+    Simulates linear nonisothermal curves for several models and heating 
+    rates at once, with the same solver as single_nonisothermal.
+    
+    Parameters
+    ----------
+    models : iterable (callable)
+        Integral forms of kinetic models.
+    A : float or ndarray
+        Pre-exponential factor, one for all models or one per model.
+    E : float or ndarray
+        Activation energy (J/mol), one for all models or one per model.
+    alphas : ndarray
+        Transformed fraction values.
+    rates : iterable
+        Linear heating rates.
+    
+    Returns
+    -------
+    ndarray of simulated temperatures with shape (rate, model, alpha).
+    """
+    g, A, E = _batch_setup(models, A, E, alphas)
+    rates = np.asarray(rates, dtype=float)[:, np.newaxis, np.newaxis]
+    return E / (R * senumyang_inverse(g * (rates*R) / (A*E)))
+
+def _batch_setup(models, A, E, alphas):
+    """(model, alpha) model values and (model, 1) A, E columns."""
+    alphas = np.asarray(alphas, dtype=float)
+    g = np.array([model(alphas) for model in models])
+    A = np.asarray(A, dtype=float).reshape(-1, 1)
+    E = np.asarray(E, dtype=float).reshape(-1, 1)
+    return g, A, E
     
 def ni_rates(*args):
     """
@@ -129,23 +214,17 @@ def ni_rates(*args):
     
     Returns
     -------
-    k : iterable
-        List of rate constants for given non-isothermal step
+    k : ndarray
+        Rate constants for given non-isothermal step
     """
     
-    b, T, A, E = args[0], args[1], [], []
-    cycle = itertools.cycle([A, E])
-    
-    for arg in args[2:]:
-        cycle.next().append(arg)
-    
-    K = []
-    for n, _ in enumerate(A):
-        K.append(A[n]/b * math.exp(-E[n]/(R*T)))
-        
-    return K
+    b, T = args[0], args[1]
+    A, E = np.asarray(args[2::2]), np.asarray(args[3::2])
+    return A/b * np.exp(-E/(R*T))
 
-def ni_integrate(func, T0, args=None, dT=1, T1=None, verbose=False):
+def ni_integrate(func, T0, args=None, dT=1, T1=None, verbose=False, 
+                 grid=None, target=1, span=1000, method="LSODA", rtol=1e-6,
+                 atol=1e-9):
     """
     Integrate a non-isothermal composite kinetic model.
     
@@ -163,40 +242,67 @@ def ni_integrate(func, T0, args=None, dT=1, T1=None, verbose=False):
         Force final simulation temperature to this value.
     verbose : boolean (optional)
         Print results from every integration step
+    grid : iterable (optional)
+        Report transformation fractions on these temperatures instead of 
+        every dT. Points past the end of the simulation keep its last value,
+        and points below T0 its initial one (zero).
+    target : float (optional)
+        Without T1, the simulation stops when the total transformed fraction
+        reaches this value.
+    span : int or float (optional)
+        Without T1, temperature range after which the simulation stops even
+        if target was not reached.
+    method : str (optional)
+        Proxy for solve_ivp(method=value).
+    rtol, atol : float (optional)
+        Integrator tolerances.
         
     Returns
     -------
-    temps : iterable
-        Temperature list.
-    alphas: iterable
-        Transformation fraction list.
+    temps : ndarray
+        Temperatures, T0 + dT, T0 + 2*dT... up to the final temperature 
+        (excluded), or grid.
+    alphas: ndarray
+        Transformation fractions.
     """
+    with track("ni_integrate", method=method, T0=T0, T1=T1) as record:
+        return _ni_integrate(func, T0, args, dT, T1, verbose, grid, target,
+                             span, method, rtol, atol, record)
+
+def _ni_integrate(func, T0, args, dT, T1, verbose, grid, target, span, method,
+                  rtol, atol, record):
+    args = tuple(args or ())
+    n = int(math.ceil(len(args[2:]) / 2)) + 1
+    fun = record.counted(lambda T, y: func(T, y, *args), 'rhs')
     
-    n = math.ceil(len(args[2:]) / 2) + 1
-    r = ode(func).set_integrator('zvode', method='bdf', with_jacobian=False)
-    r.set_initial_value(np.zeros(n), T0).set_f_params(*args)
-    temps, alphas = [], []
+    if T1:
+        end, events = T1, None
+    else:
+        # last y position should be total transformed fraction
+        end = T0 + span
+        events = lambda T, y: y[n-1] - target
+        events.terminal, events.direction = True, 1
     
-    while r.successful():
-        r.integrate(r.t+dT)
-        
-        if verbose:
-            print r.t, r.y
-        
-        # work until alpha == 1
-        if not T1: 
-            if r.y[n-1] < 1: # last y position should be total transformed fraction
-                temps.append(r.t)
-                alphas.append(r.y[n-1])
-            else:
-                break
-        
-        # work until given last temperature (long graph style)
-        else:      
-            if r.t < T1:
-                temps.append(r.t)
-                alphas.append(r.y[n-1])
-            else:
-                break
-                
+    with record.stage('integrate'):
+        sol = solve_ivp(fun, (T0, end), np.zeros(n), method=method, rtol=rtol,
+                        atol=atol, events=events, dense_output=True)
+    record.update(status=sol.status, message=sol.message, steps=len(sol.t),
+                  nfev=sol.nfev, njev=sol.njev, nlu=sol.nlu, final=sol.t[-1])
+    
+    if verbose:
+        for T, y in zip(sol.t, sol.y.T):
+            print T, y
+    
+    final = sol.t[-1]
+    if grid is None:
+        count = max(0, int(math.ceil((final - T0) / dT)) - 1)
+        temps = T0 + dT * np.arange(1, count + 1, dtype=float)
+    else:
+        temps = np.asarray(grid, dtype=float)
+    
+    with record.stage('sample'):
+        alphas = np.zeros(temps.shape)
+        inside = (temps >= T0) & (temps <= final)
+        alphas[inside] = sol.sol(temps[inside])[n-1]
+        alphas[temps > final] = sol.y[n-1, -1]
     return temps, alphas
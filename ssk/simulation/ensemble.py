@@ -0,0 +1,96 @@
+"""
+Ensemble integration of composite reaction mechanisms.
+
+* Every parameter set is integrated with ni_integrate in a worker process.
+  The mechanism function must be picklable, i.e. defined at module level.
+
+* ni_ensemble_iter yields results in completion order, already sampled on a
+  uniform temperature grid; ni_ensemble collects them in a single array.
+"""
+
+from __future__ import division
+import multiprocessing
+import numpy as np
+
+from .api import ni_integrate
+
+__all__ = ['ni_ensemble', 'ni_ensemble_iter']
+
+def ni_ensemble_iter(func, T0, T1, params, dT=1, processes=None, chunksize=1):
+    """
+    Integrate a non-isothermal composite kinetic model for many parameter
+    sets concurrently, yielding every curve as soon as it is finished.
+
+    Parameters
+    ----------
+    func : callable
+        Model function, as in ni_integrate.
+    T0, T1 : int or float
+        Starting and final temperature (in Kelvins)
+    params : iterable
+        Parameter sets, each one a heating rate followed by A, E pairs.
+    dT : int or float
+        Temperature step size
+    processes : int (optional)
+        Worker processes. Defaults to the CPU count, 1 runs serially.
+    chunksize : int
+        Parameter sets sent to a worker at once.
+
+    Yields
+    ------
+    (index, temps, alphas) tuples, where index is the position of the
+    parameter set in params and temps the grid from T0 to T1 in dT steps.
+    """
+    tasks = ((n, func, T0, T1, args, dT) for n, args in enumerate(params))
+
+    if processes == 1:
+        for task in tasks:
+            yield _ensemble_task(task)
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(_ensemble_task, tasks, chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+def ni_ensemble(func, T0, T1, params, dT=1, processes=None, chunksize=1,
+                callback=None):
+    """
+    Integrate a non-isothermal composite kinetic model for many parameter
+    sets concurrently and return all curves on a shared temperature grid.
+
+    Parameters
+    ----------
+    func, T0, T1, params, dT, processes, chunksize
+        Same as ni_ensemble_iter.
+    callback : callable (optional)
+        Called with (index, temps, alphas) for every finished curve.
+
+    Returns
+    -------
+    temps : ndarray
+        Temperature grid, from T0 to T1 in dT steps.
+    alphas : ndarray
+        Transformation fractions with shape (parameter set, temperature).
+    """
+    params = list(params)
+    grid = np.arange(T0, T1, dT)
+    alphas = np.empty((len(params), len(grid)))
+
+    for n, temps, curve in ni_ensemble_iter(func, T0, T1, params, dT,
+                                            processes, chunksize):
+        if callback is not None:
+            callback(n, temps, curve)
+        alphas[n] = curve
+
+    return grid, alphas
+
+def _ensemble_task(task):
+    """ni_ensemble_iter's worker: integrates one parameter set."""
+    n, func, T0, T1, args, dT = task
+    grid = np.arange(T0, T1, dT)
+    return (n,) + ni_integrate(func, T0, args=args, T1=T1, grid=grid)
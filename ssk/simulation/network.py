@@ -0,0 +1,159 @@
+"""
+Declarative composite reaction mechanisms.
+
+* A mechanism is a list of Step tuples. Every step has its own transformed
+  fraction a_j, and the mechanism's total fraction is a weighted sum of them.
+
+* An independent step follows da_j/dT = k_j * f_j(a_j). A step with a parent
+  can only transform what its parent has produced:
+  da_j/dT = k_j * a_p * f_j(a_j / a_p), which for first order models reduces
+  to k_j * (a_p - a_j), the consecutive A -> B -> C scheme.
+
+* ni_network builds the right-hand side and its analytic Jacobian once.
+  Model derivatives are taken with the complex step method, which is exact
+  to machine precision for the closed-form models in ssk.models.
+"""
+
+from __future__ import division
+import collections
+import numpy as np
+from scipy.constants import R
+from scipy.integrate import solve_ivp
+
+__all__ = ['Step', 'ni_network', 'ni_solve']
+
+class Step(collections.namedtuple('Step', ['model', 'A', 'E', 'parent'])):
+    """
+    One reaction step of a mechanism.
+
+    Parameters
+    ----------
+    model : callable
+        Differential form of a kinetic model.
+    A : float or int
+        Pre-exponential factor.
+    E : float or int
+        Activation energy (J/mol)
+    parent : int (optional)
+        Index of the step whose product this step consumes.
+    """
+    __slots__ = ()
+
+    def __new__(cls, model, A, E, parent=None):
+        return super(Step, cls).__new__(cls, model, A, E, parent)
+
+def ni_network(steps, rate):
+    """
+    Builds the non-isothermal right-hand side of a mechanism and its
+    Jacobian, in the form expected by scipy.integrate.solve_ivp.
+
+    Parameters
+    ----------
+    steps : iterable (Step)
+        Reaction steps.
+    rate : float or int
+        Linear heating rate.
+
+    Returns
+    -------
+    fun : callable
+        fun(T, y), vectorized over the columns of y.
+    jac : callable
+        jac(T, y) with shape (step, step).
+    """
+    steps = [Step(*step) for step in steps]
+    size = len(steps)
+    A = np.array([step.A for step in steps], dtype=float)
+    E = np.array([step.E for step in steps], dtype=float)
+    chained = np.array([step.parent is not None for step in steps])
+    parents = np.array([i if step.parent is None else step.parent
+                        for i, step in enumerate(steps)])
+    models = [step.model for step in steps]
+
+    def constants(T):
+        return A / rate * np.exp(-E / (R*T))
+
+    def fractions(y):
+        # available material and reduced fraction of every step
+        available = np.where(chained[:, np.newaxis], y[parents], 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = np.clip(np.where(available > 0, y / available, 0), 0, 1)
+        active = (available > 0) & (u < 1)
+        return available, np.where(active, u, 0), active
+
+    def fun(T, y):
+        y = np.asarray(y, dtype=float)
+        column = y.ndim == 1
+        y = y.reshape(size, -1)
+        available, u, active = fractions(y)
+        f = np.array([model(row) for model, row in zip(models, u)])
+        dy = np.where(active, constants(T)[:, np.newaxis] * available * f, 0)
+        return dy[:, 0] if column else dy
+
+    def jac(T, y):
+        y = np.asarray(y, dtype=float).reshape(size, 1)
+        available, u, active = fractions(y)
+        u, active = u[:, 0], active[:, 0]
+        k = constants(T)
+        f = np.array([model(x) for model, x in zip(models, u)])
+        df = np.array([_derivative(model, x) for model, x in zip(models, u)])
+
+        J = np.zeros((size, size))
+        index = np.arange(size)
+        J[index, index] = np.where(active, k * df, 0)
+        chain = chained & active
+        J[index[chain], parents[chain]] += k[chain] * (f - u * df)[chain]
+        return J
+
+    return fun, jac
+
+def ni_solve(steps, rate, T0, T1, weights=None, dT=1, y0=None, method="LSODA",
+             rtol=1e-6, atol=1e-9):
+    """
+    Integrate a non-isothermal mechanism described by a list of Step tuples.
+
+    Parameters
+    ----------
+    steps : iterable (Step)
+        Reaction steps.
+    rate : float or int
+        Linear heating rate.
+    T0, T1 : int or float
+        Starting and final temperature (in Kelvins)
+    weights : iterable (optional)
+        Contribution of every step to the total transformed fraction.
+        Defaults to equal weights.
+    dT : int or float
+        Temperature step of the returned curve.
+    y0 : iterable (optional)
+        Initial transformed fraction of every step, zeros by default.
+        Models with a null rate at alpha = 0 (A, P, B1) need a small
+        positive value to start.
+    method : str
+        Proxy for solve_ivp(method=value). The default LSODA switches to a
+        stiff solver when needed; "BDF" and "Radau" are the alternatives.
+
+    Returns
+    -------
+    temps : ndarray
+        Temperature grid.
+    alphas : ndarray
+        Total transformation fraction at every temperature.
+    """
+    size = len(steps)
+    weights = np.full(size, 1/size) if weights is None else np.asarray(weights)
+    y0 = np.zeros(size) if y0 is None else np.asarray(y0, dtype=float)
+
+    fun, jac = ni_network(steps, rate)
+    sol = solve_ivp(fun, (T0, T1), y0, method=method, jac=jac, rtol=rtol,
+                    atol=atol, vectorized=True, dense_output=True)
+    if not sol.success:
+        raise RuntimeError(sol.message)
+
+    temps = np.arange(T0, T1, dT)
+    return temps, np.dot(weights, sol.sol(temps))
+
+def _derivative(model, a, h=1e-20):
+    """Complex step derivative of a kinetic model."""
+    with np.errstate(all='ignore'):
+        return np.imag(model(a + 1j*h)) / h
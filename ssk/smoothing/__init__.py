@@ -1 +1,3 @@
 from savitzky_golay import *
+from convolution import *
+from filters import *
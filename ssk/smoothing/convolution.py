@@ -0,0 +1,76 @@
+"""
+'valid' mode convolution along the last axis of 1-D or 2-D signals, shared
+by the smoothing filters.
+
+* Direct convolution costs O(N*w) for a window of w samples. From
+  FFT_THRESHOLD samples on, an FFT overlap-add convolution, O(N*log(w)), is
+  used instead.
+"""
+
+from __future__ import division
+import numpy as np
+
+__all__ = ['convolve']
+
+FFT_THRESHOLD = 192
+
+def convolve(m, y, method="auto"):
+    """
+    Convolution of a kernel with a signal (or each row of a 2-D array of
+    signals), returning only the fully overlapping part, like
+    np.convolve(m, y, mode='valid').
+
+    Parameters
+    ----------
+    m : array_like, shape (w,)
+        Convolution kernel.
+    y : array_like, shape (N,) or (runs, N)
+        Signals.
+    method : str
+        "direct", "fft" (overlap-add) or "auto" (by kernel size).
+
+    Returns
+    -------
+    ndarray, shape (N - w + 1,) or (runs, N - w + 1).
+    """
+    m = np.asarray(m, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if method == "auto":
+        method = "fft" if len(m) >= FFT_THRESHOLD else "direct"
+
+    if method == "fft":
+        return _oaconvolve(m, y)
+    elif method != "direct":
+        raise NotImplementedError("method parameter not recognized")
+
+    if y.ndim == 1:
+        return np.convolve(m, y, mode='valid')
+    if len(m) % 2 == 0:
+        return np.array([np.convolve(m, row, mode='valid') for row in y])
+    from scipy.ndimage import convolve1d
+
+    half = (len(m) - 1) // 2
+    full = convolve1d(y, m, axis=-1, mode='constant')
+    return full[..., half:y.shape[-1] - half]
+
+def _oaconvolve(m, y):
+    """Overlap-add FFT convolution in blocks a few times the kernel size."""
+    w, size = len(m), y.shape[-1]
+    lead = y.shape[:-1]
+    nfft = 1 << int(np.ceil(np.log2(4 * w)))
+    step = nfft - w + 1
+    count = -(-size // step)
+
+    padded = np.zeros(lead + (count * step,))
+    padded[..., :size] = y
+    blocks = padded.reshape(lead + (count, step))
+    blocks = np.fft.irfft(np.fft.rfft(blocks, nfft) * np.fft.rfft(m, nfft),
+                          nfft)
+
+    # every block spills its last w - 1 samples into the next one
+    out = np.zeros(lead + ((count + 1) * step,))
+    out[..., :count * step] += blocks[..., :step].reshape(lead + (-1,))
+    tails = np.zeros(lead + (count, step))
+    tails[..., :w - 1] = blocks[..., step:]
+    out[..., step:] += tails.reshape(lead + (-1,))
+    return out[..., w - 1:size]
@@ -0,0 +1,128 @@
+"""
+Additional smoothing filters for thermal analysis signals, and smooth, a
+shared interface to all of them.
+
+* moving_regression fits a straight line over a sliding window of samples
+  with their actual x values (irregular temperature or time steps), in O(N)
+  through cumulative sums.
+
+* whittaker is the Whittaker-Eilers smoother: it minimizes
+  |y - z|**2 + lmbda*|D z|**2, with D the d-th order difference matrix. The
+  system matrix is sparse and banded: it is built directly in banded 
+  storage and solved by banded Cholesky, both in O(N).
+"""
+
+from __future__ import division
+import numpy as np
+
+from .savitzky_golay import savitzky_golay, savitzky_golay_batch
+
+__all__ = ['moving_regression', 'whittaker', 'smooth']
+
+def moving_regression(y, window_size, x=None):
+    """
+    Moving-window linear regression smoother.
+
+    Parameters
+    ----------
+    y : array_like, shape (N,) or (runs, N)
+        Signals.
+    window_size : int
+        Samples per window, an odd number. Windows are truncated at the
+        signal ends.
+    x : array_like, shape (N,) (optional)
+        Sample positions, evenly spaced by default.
+
+    Returns
+    -------
+    ndarray with the regression line of every window evaluated at its
+    center sample.
+    """
+    if window_size % 2 != 1 or window_size < 3:
+        raise TypeError("window_size size must be an odd number above 1")
+
+    y = np.asarray(y, dtype=float)
+    size = y.shape[-1]
+    x = np.arange(size, dtype=float) if x is None else np.asarray(x, dtype=float)
+    # centering x keeps the cumulative sums well conditioned
+    x = x - x.mean()
+
+    half = (window_size - 1) // 2
+    index = np.arange(size)
+    low = np.clip(index - half, 0, size)
+    high = np.clip(index + half + 1, 0, size)
+
+    def window_sums(values):
+        cumulative = np.zeros(values.shape[:-1] + (size + 1,))
+        cumulative[..., 1:] = np.cumsum(values, axis=-1)
+        return cumulative[..., high] - cumulative[..., low]
+
+    n = high - low
+    sx, sxx = window_sums(x), window_sums(x * x)
+    sy, sxy = window_sums(y), window_sums(x * y)
+
+    slope = (n * sxy - sx * sy) / (n * sxx - sx**2)
+    return (sy - slope * sx) / n + slope * x
+
+def whittaker(y, lmbda=100, d=2):
+    """
+    Whittaker-Eilers smoother.
+
+    Parameters
+    ----------
+    y : array_like, shape (N,) or (runs, N)
+        Signals, evenly sampled.
+    lmbda : float
+        Smoothing parameter, larger is smoother.
+    d : int
+        Order of the differences penalized.
+
+    Returns
+    -------
+    ndarray with the smoothed signals.
+    """
+    from scipy.linalg import solveh_banded
+
+    y = np.asarray(y, dtype=float)
+    size = y.shape[-1]
+
+    # upper banded storage of I + lmbda * D'D, with D the (N - d) x N 
+    # difference matrix whose rows hold the coefficients c
+    c = np.diff(np.eye(d + 1), d, axis=0)[0]
+    banded = np.zeros((d + 1, size))
+    banded[d] = 1
+    for k in range(d + 1):
+        for t in range(d + 1 - k):
+            banded[d - k, t + k:size - d + t + k] += lmbda * c[t] * c[t + k]
+
+    return solveh_banded(banded, y.T, check_finite=False).T
+
+def smooth(y, method="savitzky_golay", **kwargs):
+    """
+    Smooths a signal, or every row of a 2-D array of signals, with any of
+    the filters in this submodule.
+
+    Parameters
+    ----------
+    y : array_like, shape (N,) or (runs, N)
+        Signals.
+    method : str
+        "savitzky_golay", "moving_regression" or "whittaker".
+    kwargs
+        Filter parameters (window_size and order, window_size and x, lmbda
+        and d, respectively).
+
+    Returns
+    -------
+    ndarray with the smoothed signals.
+    """
+    y = np.asarray(y, dtype=float)
+    if method == "savitzky_golay":
+        sg = savitzky_golay_batch if y.ndim == 2 else savitzky_golay
+        return sg(y, **kwargs)
+    elif method == "moving_regression":
+        return moving_regression(y, **kwargs)
+    elif method == "whittaker":
+        return whittaker(y, **kwargs)
+    else:
+        raise NotImplementedError("method parameter not recognized")
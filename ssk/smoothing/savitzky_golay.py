@@ -1,9 +1,27 @@
 # Code is from https://gist.github.com/RyanHope/2321077.
+#
+# Convolutions go through convolution.convolve, which switches to an FFT 
+# overlap-add method for large windows.
+#
+# Filter coefficients are cached by (window_size, order, deriv) in _COEFFS.
+# savitzky_golay_batch and savitzky_golay_stream reproduce savitzky_golay's
+# output (including its mirrored padding) for 2-D arrays and chunked signals.
+#
+# scipy.signal is slow to import and only sgolay2d needs it, so it is
+# imported there.
 
 import numpy as np
-import scipy, scipy.signal
 
-__all__ = ['savitzky_golay']
+from .convolution import convolve
+
+__all__ = [
+    'savitzky_golay', 
+    'savitzky_golay_batch', 
+    'savitzky_golay_stream',
+    'savitzky_golay_piecewise'
+]
+
+_COEFFS = {}
 
 def savitzky_golay( y, window_size, order, deriv=0):
     r"""
@@ -59,6 +77,80 @@ def savitzky_golay( y, window_size, order, deriv=0):
        W.H. Press, S.A. Teukolsky, W.T. Vetterling, B.P. Flannery
        Cambridge University Press ISBN-13: 9780521880688
     """
+    m = _sg_coeffs( window_size, order, deriv )
+    half_window = ( len( m ) - 1 ) // 2
+    # pad the signal at the extremes with
+    # values taken from the signal itself
+    firstvals = y[0] - np.abs( y[1:half_window + 1][::-1] - y[0] )
+    lastvals = y[-1] + np.abs( y[-half_window - 1:-1][::-1] - y[-1] )
+    y = np.concatenate( ( firstvals, y, lastvals ) )
+    return convolve( m, y )
+
+def savitzky_golay_batch( y, window_size, order, deriv=0 ):
+    """
+    Savitzky-Golay filter applied to every row of a 2-D array (one signal
+    per run) at once. Same parameters and padding as savitzky_golay.
+    
+    Returns
+    -------
+    ys : ndarray, shape (runs, N)
+        the smoothed signals (or their n-th derivative).
+    """
+    m = _sg_coeffs( window_size, order, deriv )
+    half_window = ( len( m ) - 1 ) // 2
+    y = np.asarray( y, dtype = float )
+    first, last = y[:, :1], y[:, -1:]
+    firstvals = first - np.abs( y[:, 1:half_window + 1][:, ::-1] - first )
+    lastvals = last + np.abs( y[:, -half_window - 1:-1][:, ::-1] - last )
+    y = np.concatenate( ( firstvals, y, lastvals ), axis = 1 )
+    return convolve( m, y )
+
+def savitzky_golay_stream( chunks, window_size, order, deriv=0 ):
+    """
+    Online Savitzky-Golay filter: smooths a signal that arrives in chunks.
+    Output lags half a window behind the input and the last samples are
+    produced when chunks is exhausted, so the concatenated output equals 
+    savitzky_golay on the whole signal.
+    
+    Parameters
+    ----------
+    chunks : iterable (array_like)
+        consecutive pieces of the signal.
+    window_size, order, deriv
+        same as savitzky_golay.
+    
+    Yields
+    ------
+    ndarray pieces of the smoothed signal (or it's n-th derivative).
+    """
+    m = _sg_coeffs( window_size, order, deriv )
+    half_window = ( len( m ) - 1 ) // 2
+    # buffer holds padded samples not yet used as a window center, tail
+    # the latest raw samples, needed for the final padding
+    buffer, tail, started = np.zeros( 0 ), np.zeros( 0 ), False
+    for chunk in chunks:
+        chunk = np.asarray( chunk, dtype = float )
+        tail = np.concatenate( ( tail, chunk ) )[-half_window - 1:]
+        buffer = np.concatenate( ( buffer, chunk ) )
+        if not started:
+            if len( buffer ) < half_window + 1:
+                continue
+            firstvals = buffer[0] - np.abs( buffer[1:half_window + 1][::-1] - buffer[0] )
+            buffer = np.concatenate( ( firstvals, buffer ) )
+            started = True
+        if len( buffer ) >= window_size:
+            yield convolve( m, buffer )
+            buffer = buffer[len( buffer ) - window_size + 1:]
+    if not started:
+        raise ValueError( "signal is shorter than half the window size" )
+    lastvals = tail[-1] + np.abs( tail[-half_window - 1:-1][::-1] - tail[-1] )
+    yield convolve( m, np.concatenate( ( buffer, lastvals ) ) )
+
+def _sg_coeffs( window_size, order, deriv=0 ):
+    """Cached Savitzky-Golay convolution coefficients."""
+    key = ( window_size, order, deriv )
+    if key in _COEFFS:
+        return _COEFFS[key]
     try:
         window_size = np.abs( np.int( window_size ) )
         order = np.abs( np.int( order ) )
@@ -73,34 +165,24 @@ def savitzky_golay( y, window_size, order, deriv=0):
     # precompute coefficients
     b = np.mat( [[k ** i for i in order_range] for k in range( -half_window, half_window + 1 )] )
     m = np.linalg.pinv( b ).A[deriv]
-    # pad the signal at the extremes with
-    # values taken from the signal itself
-    firstvals = y[0] - np.abs( y[1:half_window + 1][::-1] - y[0] )
-    lastvals = y[-1] + np.abs( y[-half_window - 1:-1][::-1] - y[-1] )
-    y = np.concatenate( ( firstvals, y, lastvals ) )
-    return np.convolve( m, y, mode = 'valid' )
+    m.flags.writeable = False
+    _COEFFS[key] = m
+    return m
 
 def savitzky_golay_piecewise( xvals, data, kernel = 11, order = 4 ):
-    turnpoint = 0
-    last = len( xvals )
-    if xvals[1] > xvals[0] : #x is increasing?
-        for i in range( 1, last ) : #yes
-            if xvals[i] < xvals[i - 1] : #search where x starts to fall
-                turnpoint = i
-                break
-    else: #no, x is decreasing
-        for i in range( 1, last ) : #search where it starts to rise
-            if xvals[i] > xvals[i - 1] :
-                turnpoint = i
-                break
-    if turnpoint == 0 : #no change in direction of x
-        return savitzky_golay( data, kernel, order )
-    else:
-        #smooth the first piece
-        firstpart = savitzky_golay( data[0:turnpoint], kernel, order )
-        #recursively smooth the rest
-        rest = savitzky_golay_piecewise( xvals[turnpoint:], data[turnpoint:], kernel, order )
-        return numpy.concatenate( ( firstpart, rest ) )
+    """
+    Savitzky-Golay filter applied separately to every monotonic piece of
+    xvals (e.g. heating and cooling segments).
+    """
+    xvals = np.asarray( xvals )
+    # pieces end where the sign of the x increments changes
+    steps = np.sign( np.diff( xvals ) )
+    # flat steps keep the previous direction
+    previous = np.maximum.accumulate( np.where( steps != 0, np.arange( len( steps ) ), 0 ) )
+    steps = steps[previous]
+    turnpoints = np.nonzero( steps[1:] * steps[:-1] < 0 )[0] + 2
+    pieces = np.split( np.asarray( data ), turnpoints )
+    return np.concatenate( [savitzky_golay( piece, kernel, order ) for piece in pieces] )
 
 def sgolay2d ( z, window_size, order, derivative = None ):
     """
@@ -167,16 +249,18 @@ def sgolay2d ( z, window_size, order, derivative = None ):
     Z[-half_size:, :half_size] = band - np.abs( np.fliplr( Z[-half_size:, half_size + 1:2 * half_size + 1] ) - band )
 
     # solve system and convolve
+    from scipy.signal import fftconvolve
+    P = np.linalg.pinv( A )
     if derivative == None:
-        m = np.linalg.pinv( A )[0].reshape( ( window_size, -1 ) )
-        return scipy.signal.fftconvolve( Z, m, mode = 'valid' )
+        m = P[0].reshape( ( window_size, -1 ) )
+        return fftconvolve( Z, m, mode = 'valid' )
     elif derivative == 'col':
-        c = np.linalg.pinv( A )[1].reshape( ( window_size, -1 ) )
-        return scipy.signal.fftconvolve( Z, -c, mode = 'valid' )
+        c = P[1].reshape( ( window_size, -1 ) )
+        return fftconvolve( Z, -c, mode = 'valid' )
     elif derivative == 'row':
-        r = np.linalg.pinv( A )[2].reshape( ( window_size, -1 ) )
-        return scipy.signal.fftconvolve( Z, -r, mode = 'valid' )
+        r = P[2].reshape( ( window_size, -1 ) )
+        return fftconvolve( Z, -r, mode = 'valid' )
     elif derivative == 'both':
-        c = np.linalg.pinv( A )[1].reshape( ( window_size, -1 ) )
-        r = np.linalg.pinv( A )[2].reshape( ( window_size, -1 ) )
-        return scipy.signal.fftconvolve( Z, -r, mode = 'valid' ), scipy.signal.fftconvolve( Z, -c, mode = 'valid' )
+        c = P[1].reshape( ( window_size, -1 ) )
+        r = P[2].reshape( ( window_size, -1 ) )
+        return fftconvolve( Z, -r, mode = 'valid' ), fftconvolve( Z, -c, mode = 'valid' )
@@ -3,6 +3,10 @@ The temperture integral arises in nonisothermal conditions, and it is an
 integral (pun intended) part of isoconversional methods and non-isothermal
 reaction simulation.
 
+Exact values of p(x) come from the exponential integral (p_integral), and
+TempIntegralTable provides interpolated lookups with a bounded error for
+inner loops that evaluate it many times.
+
 Relevant literature:
 
 Review and evaluation of the approximations to the temperature integral.
@@ -13,5 +17,6 @@ http://www.sciencedirect.com/science/article/pii/S0040603197000464
 """
 
 from api import *
+from table import *
 
 
@@ -1,34 +1,69 @@
 from __future__ import division
 import numpy as np
 from scipy.constants import R
-from scipy.integrate import quad
+from scipy.special import expn, hyperu
 
 __all__ = [
     'temp_integral', 
+    'p_integral',
+    'p_integral_log',
     'time_integral', 
     'senumyang', 
+    'senumyang_log',
+    'senumyang_dlog',
+    'senumyang_inverse',
     'timeint'
 ]
 
-def temp_integral(E, T):
-    """Evaluates the temperature integral with numerical quadrature.
+def temp_integral(E, T, method="special"):
+    """Evaluates the temperature integral, element-wise over arrays.
     
     Params
     ------
         E: Activation Energy (Joule/mol)
         T: Absolute Temperature (Kelvin)
+        method: "special" for the closed form through the exponential
+            integral, "quad" for one numerical quadrature per element.
     """
-    x = E / (R*T)
-    return E/R * quad(_inner_integral, np.inf, x)
+    x = np.asarray(E / (R*T), dtype=float)
+    if method == "special":
+        return E/R * p_integral(x)
+    elif method == "quad":
+        from scipy.integrate import quad
+        p = [np.exp(-xi) * quad(_inner_integral, 0, np.inf, args=(xi,))[0]
+             for xi in x.ravel()]
+        return E/R * np.reshape(p, x.shape)
+    else:
+        raise NotImplementedError("method parameter not recognized")
 
-def _inner_integral(x):
-    """temp_integral's inner function"""
-    return np.exp(x) / x**2
+def _inner_integral(s, x):
+    """temp_integral's inner function, shifted so that p(x) = exp(-x) * 
+       integral(0, inf)"""
+    return np.exp(-s) / (x+s)**2
 
-def time_integral():
+def p_integral(x):
+    """Exact p(x) = integral(x, inf) of exp(-u)/u**2, that is E2(x)/x."""
+    x = np.asarray(x, dtype=float)
+    return expn(2, x) / x
+
+def p_integral_log(x):
+    """Natural logarithm of p_integral, finite where p(x) underflows."""
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide='ignore'):
+        lp = np.log(p_integral(x))
+    # hyperu is slow, so it only evaluates the underflowed values
+    under = ~np.isfinite(lp)
+    if np.any(under):
+        lp, under, xs = np.atleast_1d(lp, under, x)
+        lp[under] = -xs[under] + np.log(hyperu(2, 2, xs[under]))
+        lp = lp.reshape(x.shape)
+    return lp
+
+def time_integral(Ea, t, T):
     """A time version of the temperature integral for use in
-       Vyazovkin's Method"""
-    pass
+       Vyazovkin's Method: the integral of timeint from 0 to t, which is
+       t*exp(-Ea/(R*T)) at constant temperature. Broadcasts over arrays."""
+    return t * np.exp(-Ea / (R*T))
         
 def timeint(t, Ea, T):
     """Integral for vkin_iso"""
@@ -37,4 +72,73 @@ def timeint(t, Ea, T):
 def senumyang(x):
     """Senum-Yang temperature integral approximation. x = Ea / (R*T)"""
     t1 = np.exp(-x) / x
-    return t1 * (x**3 + 18*x**2 + 86*x + 96) / (x**4 + 20*x**3 + 120*x**2 + 240*x + 120) 
+    return t1 * (x**3 + 18*x**2 + 86*x + 96) / (x**4 + 20*x**3 + 120*x**2 + 240*x + 120)
+
+def senumyang_log(x):
+    """Natural logarithm of the Senum-Yang approximation. Stays finite for 
+       large x, where senumyang itself underflows."""
+    x = np.asarray(x, dtype=float)
+    num = x**3 + 18*x**2 + 86*x + 96
+    den = x**4 + 20*x**3 + 120*x**2 + 240*x + 120
+    return -x - np.log(x) + np.log(num) - np.log(den)
+
+def senumyang_dlog(x):
+    """Derivative of senumyang_log with respect to x."""
+    x = np.asarray(x, dtype=float)
+    num = x**3 + 18*x**2 + 86*x + 96
+    den = x**4 + 20*x**3 + 120*x**2 + 240*x + 120
+    dnum = 3*x**2 + 36*x + 86
+    dden = 4*x**3 + 60*x**2 + 240*x + 240
+    return -1 - 1/x + dnum/num - dden/den
+
+def senumyang_inverse(y, xmin=1e-8, xmax=1e6, tol=1e-12, maxiter=100):
+    """
+    Solves senumyang(x) = y for x, element-wise over an array.
+    
+    Parameters
+    ----------
+    y : float or ndarray
+        Target values of the temperature integral approximation.
+    xmin, xmax : float
+        Bracket for x = Ea / (R*T). Out of bracket solutions return nan.
+    tol : float
+        Relative tolerance on x.
+    maxiter : int
+        Maximum number of Newton iterations.
+    
+    Returns
+    -------
+    ndarray of x values with the shape of y. Zero values of y map to inf
+    and negative values to nan.
+    
+    Notes
+    -----
+    The problem is solved in logarithmic form, log(senumyang(x)) = log(y),
+    which is monotone decreasing in x. Newton steps that leave the current
+    bracket fall back to bisection, so every point converges.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = y > 0
+    ly = np.log(np.where(valid, y, 1))
+    
+    # p(x) ~ exp(-x) / x**2 gives a good starting point
+    x = np.clip(-ly, 1, None)
+    x = np.clip(-ly - 2*np.log(x), xmin, xmax)
+    lo = np.full(y.shape, xmin)
+    hi = np.full(y.shape, xmax)
+    
+    for _ in range(maxiter):
+        f = senumyang_log(x) - ly
+        lo = np.where(f > 0, x, lo)
+        hi = np.where(f < 0, x, hi)
+        step = x - f / senumyang_dlog(x)
+        outside = ~((step > lo) & (step < hi))
+        step = np.where(outside, np.sqrt(lo * hi), step)
+        done = np.abs(step - x) <= tol * x
+        x = step
+        if np.all(done):
+            break
+    
+    bracketed = (senumyang_log(xmin) >= ly) & (senumyang_log(xmax) <= ly)
+    x = np.where(valid & bracketed, x, np.nan)
+    return np.where(y == 0, np.inf, x)
@@ -0,0 +1,113 @@
+"""
+Precomputed temperature integral tables.
+
+* Tables interpolate log p(x) against log x, where the curve is smooth and
+  close to linear, so few nodes give a small relative error on p(x).
+
+* The error of every table is measured against p_integral when it is built
+  and the node count is doubled until it falls under the requested bound.
+
+* Nodes are evenly spaced in log x, so a lookup finds its interval by
+  arithmetic instead of a search, and evaluates the interval's cubic from
+  a coefficient table. This makes it several times faster than
+  p_integral_log.
+"""
+
+from __future__ import division
+import numpy as np
+
+from .api import p_integral_log
+
+__all__ = ['TempIntegralTable']
+
+class TempIntegralTable(object):
+    """
+    Interpolated p(x) values over a fixed x = Ea / (R*T) range.
+
+    Parameters
+    ----------
+    xmin, xmax : float
+        Range covered by the table. Values outside it are evaluated
+        exactly with p_integral_log.
+    n : int
+        Initial number of nodes.
+    rtol : float
+        Bound on the relative error of p(x) inside the range.
+    maxn : int
+        Node count past which a table failing rtol raises ValueError.
+
+    Attributes
+    ----------
+    error : float
+        Largest relative error on p(x) measured against the exact values.
+
+    Examples
+    --------
+    table = TempIntegralTable(1, 200)
+    p = table(Ea / (R * T))
+    """
+
+    def __init__(self, xmin=1, xmax=200, n=64, rtol=1e-8, maxn=2**16):
+        if not 0 < xmin < xmax:
+            raise ValueError("table range must satisfy 0 < xmin < xmax")
+
+        from scipy.interpolate import CubicSpline
+
+        self.xmin, self.xmax, self.rtol = xmin, xmax, rtol
+        self._umin, umax = np.log(xmin), np.log(xmax)
+
+        while True:
+            u = np.linspace(self._umin, umax, n)
+            spline = CubicSpline(u, p_integral_log(np.exp(u)))
+            self._step = u[1] - u[0]
+            # one contiguous array per power (c3, c2, c1, c0), plus the
+            # cubic expanded at the last node, for x == xmax
+            last = [spline(umax, k) / f for k, f in ((3, 6), (2, 2), (1, 1),
+                                                      (0, 1))]
+            self._coeffs = [np.r_[c, end] for c, end in zip(spline.c, last)]
+
+            # check between nodes, where interpolation errors peak
+            u = np.linspace(self._umin, umax, 8*n + 1)
+            delta = self._lookup(u) - p_integral_log(np.exp(u))
+            self.error = np.max(np.abs(np.expm1(delta)))
+            self.n = n
+
+            if self.error <= rtol:
+                break
+            if n >= maxn:
+                raise ValueError("table cannot reach rtol=%g with %d nodes"
+                                 % (rtol, n))
+            n *= 2
+
+    def _lookup(self, u):
+        """Interpolated log p at u = log x, inside the range."""
+        t = u - self._umin
+        t *= 1 / self._step
+        index = t.astype(np.intp)
+        t -= index
+        t *= self._step
+        # Horner's rule, in place
+        c3, c2, c1, c0 = self._coeffs
+        out = np.take(c3, index)
+        for c in (c2, c1, c0):
+            out *= t
+            out += np.take(c, index)
+        return out
+
+    def log(self, x):
+        """Vectorized lookup of log p(x)."""
+        x = np.asarray(x, dtype=float)
+        inside = (x >= self.xmin) & (x <= self.xmax)
+
+        if np.all(inside):
+            return self._lookup(np.log(x))
+
+        out = np.empty(x.shape)
+        out[inside] = self._lookup(np.log(x[inside]))
+        out[~inside] = p_integral_log(x[~inside])
+        return out
+
+    def __call__(self, x):
+        """Vectorized lookup of p(x)."""
+        out = np.asarray(self.log(x))
+        return np.exp(out, out=out)